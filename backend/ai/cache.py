@@ -0,0 +1,113 @@
+"""
+Caches for deterministic LLM responses.
+
+LLMCache is the in-process LRU + TTL layer. A CacheBackend (e.g. Redis) can sit
+behind it so every worker and replica shares one set of cached responses.
+"""
+
+from collections import OrderedDict
+import hashlib
+import time
+from typing import Optional, Protocol
+
+from backend.utils import json_dumps, json_loads
+
+
+class LLMCache:
+    """
+    Bounded LRU cache of LLM response text with a per-entry TTL.
+
+    Entries are keyed by a hash of everything that determines the response
+    (model, system prompt, user content, max_tokens), so a page reload or a
+    repeated request returns without another provider round-trip.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(max_entries, 0)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(model: str, system: str, user_content: str, max_tokens: int) -> str:
+        """Stable SHA256 key over the inputs that determine a response."""
+        payload = json_dumps(
+            {"model": model, "sys": system, "user": user_content, "max_tokens": max_tokens},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text (marking it most recently used), or None on miss/expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value`, evicting the least recently used entries beyond max_entries."""
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit/miss counters."""
+        self._entries.clear()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def snapshot(self) -> dict[str, int]:
+        """Counters plus current size, for the /metrics endpoint."""
+        return {**self.stats, "size": len(self._entries), "max_entries": self.max_entries}
+
+
+class CacheBackend(Protocol):
+    """Shared (cross-process) store for cached LLM response text."""
+
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        ...
+
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class RedisCacheBackend(CacheBackend):
+    """CacheBackend on redis.asyncio; values are stored as {"text": ...} JSON with a TTL."""
+
+    KEY_PREFIX = "llm:"
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis_asyncio  # optional dependency, only needed when REDIS_URL is set
+
+        self._redis = redis_asyncio.Redis.from_url(url, decode_responses=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        data = await self._redis.get(self.KEY_PREFIX + key)
+        if data is None:
+            return None
+        return json_loads(data).get("text")
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self._redis.set(self.KEY_PREFIX + key, json_dumps({"text": value}), ex=max(int(ttl_seconds), 1))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.KEY_PREFIX + key)
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
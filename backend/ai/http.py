@@ -0,0 +1,22 @@
+"""Shared HTTP connection tuning for the AI provider SDK clients."""
+
+import importlib.util
+
+import httpx
+
+# HTTP/2 needs the `h2` package (installed via httpx[http2]); without it the
+# clients fall back to HTTP/1.1 keep-alive instead of failing to start.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Keep idle connections around between requests (the SDK default expires them
+# after 5s), and cap the pool so bursts queue instead of opening dozens of sockets.
+PROVIDER_HTTP_LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=16,
+    keepalive_expiry=30.0,
+)
+
+# Fail fast on connect, but leave reads long enough for a 10k-token explanation.
+# Plain seconds, since each SDK insists on its own Timeout type.
+PROVIDER_CONNECT_TIMEOUT_S = 10.0
+PROVIDER_READ_TIMEOUT_S = 600.0
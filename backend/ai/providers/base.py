@@ -32,3 +32,9 @@ class LLMProvider(Protocol):
         max_tokens: int = 4096,
     ) -> dict[str, Any]:
         ...
+
+    async def aclose(self) -> None:
+        ...
+
+    async def warmup(self) -> None:
+        ...
@@ -1,11 +1,30 @@
+import os
 from typing import Any, Optional
 
 import anthropic
 
 from backend import env, utils
+from backend.ai.http import (
+    HTTP2_AVAILABLE,
+    PROVIDER_CONNECT_TIMEOUT_S,
+    PROVIDER_HTTP_LIMITS,
+    PROVIDER_READ_TIMEOUT_S,
+)
 from backend.ai.providers.base import LLMProvider, StreamCallback
 
 
+def _cached_system(system: str) -> list[dict[str, Any]]:
+    """
+    Wrap the system prompt in a content block marked for Anthropic prompt caching.
+
+    System prompts are identical across calls (and the chat prompt repeats on
+    every tool round), so the ephemeral breakpoint lets Anthropic reuse the
+    prefilled prefix instead of re-billing it. Prompts below the model's
+    minimum cacheable length are simply not cached.
+    """
+    return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+
 class ClaudeProvider(LLMProvider):
     """Anthropic Claude implementation of the LLMProvider interface."""
 
@@ -13,6 +32,44 @@ class ClaudeProvider(LLMProvider):
 
     def __init__(self, api_key: Optional[str] = None) -> None:
         self._api_key = api_key or env.ANTHROPIC_API_KEY
+        self._client: Optional[anthropic.AsyncAnthropic] = None
+        self._client_pid = 0
+
+    def _get_client(self) -> anthropic.AsyncAnthropic:
+        """
+        Return the shared Anthropic client, creating it on first use.
+
+        Reusing one client keeps its httpx connection pool alive across calls,
+        so each request skips a fresh TCP/TLS handshake. The client is rebuilt
+        when the pid changes so a forked worker never shares pooled sockets
+        with its parent. Construction never awaits, so no lock is needed.
+        """
+        if not self._api_key:
+            raise RuntimeError("ANTHROPIC_API_KEY is not set but Claude provider is selected")
+        pid = os.getpid()
+        if self._client is None or self._client_pid != pid:
+            timeout = anthropic.Timeout(PROVIDER_READ_TIMEOUT_S, connect=PROVIDER_CONNECT_TIMEOUT_S)
+            self._client = anthropic.AsyncAnthropic(
+                api_key=self._api_key,
+                timeout=timeout,
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    limits=PROVIDER_HTTP_LIMITS,
+                    timeout=timeout,
+                    http2=HTTP2_AVAILABLE,
+                ),
+            )
+            self._client_pid = pid
+        return self._client
+
+    async def warmup(self) -> None:
+        """Open a pooled connection with a cheap model lookup so the first real call skips the handshake."""
+        await self._get_client().models.retrieve(self.MODEL)
+
+    async def aclose(self) -> None:
+        """Close the shared client's connection pool (called on app shutdown)."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
 
     async def call_llm(
         self, system: str, user_content: str, max_tokens: int = 4096, thinking_level: str = "high"
@@ -24,15 +81,12 @@ class ClaudeProvider(LLMProvider):
         prompts and callers can remain unchanged. `thinking_level` is a
         Gemini-specific knob and has no effect here.
         """
-        if not self._api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY is not set but Claude provider is selected")
-
-        client = anthropic.AsyncAnthropic(api_key=self._api_key)
-        utils.logger.info("ClaudeProvider.call_llm(): Calling Anthropic API with model %s", self.MODEL)
+        client = self._get_client()
+        utils.logger.debug("ClaudeProvider.call_llm(): Calling Anthropic API with model %s", self.MODEL)
         message = await client.messages.create(
             model=self.MODEL,
             max_tokens=max_tokens,
-            system=system,
+            system=_cached_system(system),
             messages=[{"role": "user", "content": user_content}],
         )
         return message.content[0].text
@@ -45,15 +99,12 @@ class ClaudeProvider(LLMProvider):
         max_tokens: int = 4096,
     ) -> str:
         """Stream a plain-text Claude response when no tool use is needed."""
-        if not self._api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY is not set but Claude provider is selected")
-
-        client = anthropic.AsyncAnthropic(api_key=self._api_key)
+        client = self._get_client()
         text_parts: list[str] = []
         async with client.messages.stream(
             model=self.MODEL,
             max_tokens=max_tokens,
-            system=system,
+            system=_cached_system(system),
             messages=messages,
         ) as stream:
             async for text in stream.text_stream:
@@ -71,11 +122,8 @@ class ClaudeProvider(LLMProvider):
         max_tokens: int = 4096,
     ) -> dict[str, Any]:
         """Run a Claude call that may return tool invocations."""
-        if not self._api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY is not set but Claude provider is selected")
-
-        client = anthropic.AsyncAnthropic(api_key=self._api_key)
-        utils.logger.info(
+        client = self._get_client()
+        utils.logger.debug(
             "ClaudeProvider.call_llm_with_tools(): Calling Anthropic API with model %s and %d tools",
             self.MODEL,
             len(tools),
@@ -83,7 +131,7 @@ class ClaudeProvider(LLMProvider):
         message = await client.messages.create(
             model=self.MODEL,
             max_tokens=max_tokens,
-            system=system,
+            system=_cached_system(system),
             messages=messages,
             tools=tools,
         )
@@ -0,0 +1,74 @@
+"""
+Anthropic Message Batches helper for offline/bulk workloads.
+
+Batches are processed asynchronously by Anthropic at half the token price, in
+exchange for latency measured in minutes to hours. Use this only for bulk
+backfill (e.g. pre-warming explanations); the request path keeps using the
+real-time ClaudeProvider calls.
+"""
+
+import asyncio
+from typing import Optional
+
+from backend import utils
+from backend.ai.providers.claude import ClaudeProvider, _cached_system
+
+__all__ = ["batch_call_llm"]
+
+POLL_INITIAL_DELAY_S = 5.0
+POLL_MAX_DELAY_S = 300.0
+
+
+async def batch_call_llm(
+    provider: ClaudeProvider,
+    requests: list[tuple[str, str, int]],
+) -> list[Optional[str]]:
+    """
+    Submit (system, user_content, max_tokens) requests as one Message Batch.
+
+    Polls with exponential backoff until the batch has ended, then returns the
+    assistant texts aligned to the input order. Entries whose request errored,
+    expired or was canceled come back as None.
+    """
+    if not requests:
+        return []
+
+    client = provider._get_client()
+    batch = await client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": str(index),
+                "params": {
+                    "model": provider.MODEL,
+                    "max_tokens": max_tokens,
+                    "system": _cached_system(system),
+                    "messages": [{"role": "user", "content": user_content}],
+                },
+            }
+            for index, (system, user_content, max_tokens) in enumerate(requests)
+        ]
+    )
+    utils.logger.info(
+        "claude_batch.batch_call_llm(): submitted batch %s with %d requests", batch.id, len(requests)
+    )
+
+    delay_s = POLL_INITIAL_DELAY_S
+    while batch.processing_status != "ended":
+        await asyncio.sleep(delay_s)
+        delay_s = min(delay_s * 2, POLL_MAX_DELAY_S)
+        batch = await client.messages.batches.retrieve(batch.id)
+
+    texts: list[Optional[str]] = [None] * len(requests)
+    async for entry in await client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            utils.logger.warning(
+                "claude_batch.batch_call_llm(): request %s in batch %s %s",
+                entry.custom_id,
+                batch.id,
+                entry.result.type,
+            )
+            continue
+        texts[int(entry.custom_id)] = "".join(
+            block.text for block in entry.result.message.content if hasattr(block, "text")
+        )
+    return texts
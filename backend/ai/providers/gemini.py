@@ -1,9 +1,14 @@
+import asyncio
+import hashlib
+import os
+import time
 from typing import Any, Optional
 
 from google import genai
 from google.genai import types
 
 from backend import env, utils
+from backend.ai.http import HTTP2_AVAILABLE, PROVIDER_HTTP_LIMITS
 from backend.ai.providers.base import LLMProvider, StreamCallback
 
 
@@ -17,9 +22,96 @@ class GeminiProvider(LLMProvider):
     """
 
     MODEL = env.MODEL
+    SYSTEM_CACHE_TTL_SECONDS = 3600
+    # Recreate a cache this long before it expires so no call references a dead one.
+    SYSTEM_CACHE_REFRESH_MARGIN_SECONDS = 60
 
     def __init__(self, api_key: Optional[str] = None) -> None:
         self._api_key = api_key or env.GEMINI_API_KEY
+        self._client: Optional[genai.Client] = None
+        self._client_pid = 0
+        # sha256(system) -> (cached content name or None if caching is unavailable, expiry)
+        self._system_caches: dict[str, tuple[Optional[str], float]] = {}
+        self._system_cache_lock = asyncio.Lock()
+
+    def _get_client(self) -> genai.Client:
+        """
+        Return the shared Gemini client, creating it on first use.
+
+        Passing the key explicitly skips credential discovery, and reusing the
+        client keeps its transport (and keep-alive connections) across calls.
+        The client (and the loop-bound cache lock) is rebuilt when the pid
+        changes so a forked worker never shares pooled sockets with its parent.
+        """
+        if not self._api_key:
+            raise RuntimeError("GEMINI_API_KEY is not set but Gemini provider is selected")
+        pid = os.getpid()
+        if self._client is None or self._client_pid != pid:
+            self._client = genai.Client(
+                api_key=self._api_key,
+                http_options=types.HttpOptions(
+                    async_client_args={"limits": PROVIDER_HTTP_LIMITS, "http2": HTTP2_AVAILABLE},
+                ),
+            )
+            self._client_pid = pid
+            self._system_cache_lock = asyncio.Lock()
+        return self._client
+
+    async def _get_system_cache(self, system: str) -> Optional[str]:
+        """
+        Return the name of an explicit context cache holding `system`, creating it on demand.
+
+        Keyed by a hash of the prompt so an edited prompt gets a fresh cache.
+        Returns None when Gemini refuses to cache it (e.g. below the minimum
+        token count); that outcome is remembered for the TTL so we don't retry
+        on every call, and callers fall back to an inline system_instruction.
+        """
+        key = hashlib.sha256(system.encode("utf-8")).hexdigest()
+        entry = self._system_caches.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        async with self._system_cache_lock:
+            entry = self._system_caches.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+
+            name: Optional[str] = None
+            try:
+                cache = await self._get_client().aio.caches.create(
+                    model=self.MODEL,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system,
+                        ttl=f"{self.SYSTEM_CACHE_TTL_SECONDS}s",
+                    ),
+                )
+                name = cache.name
+            except Exception as e:
+                utils.logger.info(
+                    "GeminiProvider: context cache unavailable, sending system prompt inline: %s", e
+                )
+            expires_at = time.monotonic() + self.SYSTEM_CACHE_TTL_SECONDS - self.SYSTEM_CACHE_REFRESH_MARGIN_SECONDS
+            self._system_caches[key] = (name, expires_at)
+            return name
+
+    async def warmup(self) -> None:
+        """Open a pooled connection with a cheap model lookup so the first real call skips the handshake."""
+        await self._get_client().aio.models.get(model=self.MODEL)
+
+    async def aclose(self) -> None:
+        """Delete our context caches and close the shared client (called on app shutdown)."""
+        if self._client is None:
+            return
+        for name, _expires_at in self._system_caches.values():
+            if not name:
+                continue
+            try:
+                await self._client.aio.caches.delete(name=name)
+            except Exception as e:
+                utils.logger.warning("GeminiProvider.aclose(): failed to delete cache %s: %s", name, e)
+        self._system_caches.clear()
+        await self._client.aio.aclose()
+        self._client = None
 
     async def call_llm(
         self, system: str, user_content: str, max_tokens: int = 4096, thinking_level: str = "high"
@@ -27,17 +119,16 @@ class GeminiProvider(LLMProvider):
         """
         Call the Gemini text model asynchronously.
         """
-        if not self._api_key:
-            raise RuntimeError("GEMINI_API_KEY is not set but Gemini provider is selected")
-
-        utils.logger.info("GeminiProvider.call_llm(): Calling Gemini API with model %s", self.MODEL)
-        client = genai.Client()
+        utils.logger.debug("GeminiProvider.call_llm(): Calling Gemini API with model %s", self.MODEL)
+        client = self._get_client()
+        cache_name = await self._get_system_cache(system)
         response = await client.aio.models.generate_content(
             model=self.MODEL,
             contents=user_content,
             config=types.GenerateContentConfig(
                 thinking_config=types.ThinkingConfig(thinking_level=thinking_level),
-                system_instruction=system,
+                system_instruction=None if cache_name else system,
+                cached_content=cache_name,
                 max_output_tokens=max_tokens,
             ),
         )
@@ -52,11 +143,8 @@ class GeminiProvider(LLMProvider):
         max_tokens: int = 4096,
     ) -> str:
         """Stream a plain-text Gemini response when no tool use is needed."""
-        if not self._api_key:
-            raise RuntimeError("GEMINI_API_KEY is not set but Gemini provider is selected")
-
-        utils.logger.info("GeminiProvider.stream_llm(): Streaming Gemini API with model %s", self.MODEL)
-        client = genai.Client()
+        utils.logger.debug("GeminiProvider.stream_llm(): Streaming Gemini API with model %s", self.MODEL)
+        client = self._get_client()
         contents = []
         for msg in messages:
             role = "user" if msg["role"] == "user" else "model"
@@ -89,15 +177,12 @@ class GeminiProvider(LLMProvider):
         max_tokens: int = 4096,
     ) -> dict[str, Any]:
         """Run a Gemini call that may return function calls."""
-        if not self._api_key:
-            raise RuntimeError("GEMINI_API_KEY is not set but Gemini provider is selected")
-
-        utils.logger.info(
+        utils.logger.debug(
             "GeminiProvider.call_llm_with_tools(): Calling Gemini API with model %s and %d tools",
             self.MODEL,
             len(tools),
         )
-        client = genai.Client()
+        client = self._get_client()
 
         function_declarations = []
         for tool in tools:
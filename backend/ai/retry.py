@@ -1,7 +1,8 @@
 """Shared retry helpers for transient upstream AI service failures."""
 
 import asyncio
-from typing import Awaitable, Callable, TypeVar
+from typing import Awaitable, Callable, Optional, TypeVar
+import weakref
 
 import httpx
 
@@ -29,6 +30,42 @@ RETRYABLE_ERROR_MARKERS = (
 )
 
 
+# Longest provider-advertised Retry-After we'll sleep through before retrying.
+RETRY_AFTER_MAX_WAIT_S = 30.0
+
+# One semaphore per event loop (asyncio primitives are bound to the loop they're used on).
+# Streams get their own pool: a long streamed generation holds its slot until the last
+# chunk, and must not starve the short calls (chat, suggestions, file selection).
+_call_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_stream_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _call_semaphore(streaming: bool = False) -> asyncio.Semaphore:
+    """The running loop's process-wide cap on in-flight provider calls (or streams)."""
+    loop = asyncio.get_running_loop()
+    semaphores = _stream_semaphores if streaming else _call_semaphores
+    semaphore = semaphores.get(loop)
+    if semaphore is None:
+        limit = env.AI_MAX_CONCURRENT_STREAMS if streaming else env.AI_MAX_CONCURRENT_CALLS
+        semaphore = semaphores[loop] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _retry_after_s(exc: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header on the error's HTTP response, if the provider sent one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):  # missing, or an HTTP-date we don't bother parsing
+        return None
+
+
 def is_retryable_ai_error(exc: Exception) -> bool:
     """Best-effort detection for transient provider/API failures."""
     if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
@@ -57,25 +94,41 @@ async def with_ai_retry(
     operation_name: str,
     operation: Callable[[], Awaitable[T]],
     attempts: int | None = None,
+    retryable: Callable[[Exception], bool] = is_retryable_ai_error,
+    streaming: bool = False,
 ) -> T:
-    """Retry transient AI failures with short exponential backoff."""
+    """
+    Retry transient AI failures with short exponential backoff.
+
+    Each attempt holds a slot of the process-wide provider semaphore (waiters
+    are served in arrival order), so a burst queues here instead of hitting the
+    provider's rate limit all at once. Slots are released while backing off,
+    and a Retry-After from the provider stretches the backoff up to
+    RETRY_AFTER_MAX_WAIT_S. `retryable` decides which failures get another
+    attempt (default: is_retryable_ai_error). Pass streaming=True for streamed
+    generations so they count against AI_MAX_CONCURRENT_STREAMS instead.
+    """
     max_attempts = attempts or env.AI_SERVICE_MAX_RETRIES
     last_error: Exception | None = None
 
     for attempt in range(1, max_attempts + 1):
         try:
-            result = await operation()
+            async with _call_semaphore(streaming):
+                result = await operation()
             if attempt > 1:
                 _track_retry("ai_retry_recovered", operation=operation_name, attempts_used=attempt)
             return result
         except Exception as exc:  # noqa: BLE001
             last_error = exc
-            if not is_retryable_ai_error(exc) or attempt == max_attempts:
-                if is_retryable_ai_error(exc) and attempt == max_attempts and max_attempts > 1:
+            if not retryable(exc) or attempt == max_attempts:
+                if retryable(exc) and attempt == max_attempts and max_attempts > 1:
                     _track_retry("ai_retry_exhausted", operation=operation_name, attempts=attempt)
                 raise
 
             delay_s = 0.75 * (2 ** (attempt - 1))
+            retry_after_s = _retry_after_s(exc)
+            if retry_after_s is not None:
+                delay_s = max(delay_s, min(retry_after_s, RETRY_AFTER_MAX_WAIT_S))
             utils.logger.warning(
                 "AI retry: %s failed on attempt %d/%d, retrying in %.2fs: %s",
                 operation_name,
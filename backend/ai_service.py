@@ -1,9 +1,14 @@
-from typing import Callable, List, Optional, Tuple
+import asyncio
+from functools import lru_cache
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple
 
 from backend import env, utils
+from backend.ai.cache import CacheBackend, LLMCache, RedisCacheBackend
 from backend.ai.providers.base import LLMProvider
-from backend.ai.retry import with_ai_retry
+from backend.ai.retry import is_retryable_ai_error, with_ai_retry
 from backend.ai.providers.claude import ClaudeProvider
+from backend.ai.providers.claude_batch import batch_call_llm
 from backend.ai.providers.gemini import GeminiProvider
 from backend.prompts import (
     SYSTEM_PROMPT,
@@ -17,10 +22,26 @@ from backend.prompts import (
 )
 from backend.schema import RepoInfo
 
-__all__ = ["get_files_to_explore", "explain_repo", "suggest_questions"]
+__all__ = [
+    "get_files_to_explore",
+    "explain_repo",
+    "explain_repos_bulk",
+    "suggest_questions",
+    "llm_cache_stats",
+]
 
+EXPLAIN_MAX_TOKENS = 10_000
 
-_provider: Optional[LLMProvider] = None
+
+_llm_cache = LLMCache(
+    max_entries=env.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=env.CACHE_TTL_DAYS * 24 * 60 * 60,
+)
+# A leading path segment repeated one or more times, e.g. "fastapi/fastapi/...".
+_DUP_LEADING_SEGMENT_RE = re.compile(r"^([^/]+)(?:/\1)+(?=/|$)")
+
+# Single-flight map: cache key -> the one in-flight provider call for those inputs.
+_inflight: dict[str, "asyncio.Task[str]"] = {}
 
 
 def _normalize_llm_path(path: str, repo_prefix: str = "") -> str:
@@ -38,40 +59,230 @@ def _normalize_llm_path(path: str, repo_prefix: str = "") -> str:
     if repo_prefix:
         prefix_slash = repo_prefix.rstrip("/") + "/"
         while path.startswith(prefix_slash):
-            path = path[len(prefix_slash):]
+            path = path.removeprefix(prefix_slash)
 
-    # Step 2: collapse remaining duplicate leading segments.
-    parts = [p for p in path.split("/") if p]
-    while len(parts) > 1 and parts[0] == parts[1]:
-        del parts[1]
-    return "/".join(parts)
+    # Step 2: drop empty segments, then collapse remaining duplicate leading segments.
+    path = "/".join(filter(None, path.split("/")))
+    return _DUP_LEADING_SEGMENT_RE.sub(r"\1", path, count=1)
 
 
-def _get_provider() -> LLMProvider:
+@lru_cache(maxsize=None)
+def _build_provider(provider_name: str) -> LLMProvider:
     """
-    Lazily construct and cache the configured provider.
+    Construct the provider for `provider_name`, once per name.
 
-    Provider selection is controlled by env.AI_PROVIDER.
+    lru_cache makes the construction atomic and keeps a single instance (and
+    its pooled client) per provider; unknown names fall back to Claude.
     """
-    global _provider
-    if _provider is not None:
-        return _provider
-
-    provider_name = (env.AI_PROVIDER or "claude").strip().lower()
-
     if provider_name == "gemini":
         utils.logger.info("ai_service: using Gemini provider")
-        _provider = GeminiProvider()
-    elif provider_name == "claude":
+        return GeminiProvider()
+    if provider_name == "claude":
         utils.logger.info("ai_service: using Claude provider")
-        _provider = ClaudeProvider()
-    else:
-        utils.logger.warning(
-            "ai_service: unknown AI_PROVIDER '%s', defaulting to Claude", provider_name
+        return ClaudeProvider()
+    utils.logger.warning(
+        "ai_service: unknown AI_PROVIDER '%s', defaulting to Claude", provider_name
+    )
+    return ClaudeProvider()
+
+
+def _get_provider() -> LLMProvider:
+    """
+    Return the cached provider for the configured env.AI_PROVIDER.
+    """
+    return _build_provider((env.AI_PROVIDER or "claude").strip().lower())
+
+
+async def warm_up_provider() -> None:
+    """Pre-open the provider's connection pool at startup. Failures are logged, never raised."""
+    try:
+        await _get_provider().warmup()
+        utils.logger.info("ai_service: provider connection warmed up")
+    except Exception as e:
+        utils.logger.warning("ai_service.warm_up_provider failed: %s", e)
+
+
+async def aclose_provider() -> None:
+    """Close the cached provider's client, if one was ever constructed."""
+    if _build_provider.cache_info().currsize == 0:
+        return
+    await _get_provider().aclose()
+    _build_provider.cache_clear()
+
+
+def llm_cache_stats() -> dict[str, int]:
+    """Hit/miss counters and size of the in-process LLM response cache."""
+    return _llm_cache.snapshot()
+
+
+@lru_cache(maxsize=None)
+def _get_shared_cache() -> Optional[CacheBackend]:
+    """Return the cross-worker cache backend when REDIS_URL is configured, else None."""
+    if not env.REDIS_URL:
+        return None
+    try:
+        return RedisCacheBackend(env.REDIS_URL)
+    except ImportError:
+        utils.logger.warning("ai_service: REDIS_URL is set but the redis package is not installed")
+        return None
+
+
+async def aclose_shared_cache() -> None:
+    """Close the shared cache connection pool, if one was ever constructed."""
+    if _get_shared_cache.cache_info().currsize == 0:
+        return
+    shared = _get_shared_cache()
+    _get_shared_cache.cache_clear()
+    if shared is not None:
+        await shared.aclose()
+
+
+async def _cache_get(key: str) -> Optional[str]:
+    """Look up a response in the in-process cache, then the shared backend (backfilling locally)."""
+    text = _llm_cache.get(key)
+    shared = _get_shared_cache()
+    if text is not None or shared is None:
+        return text
+    try:
+        text = await shared.get(key)
+    except Exception as e:
+        utils.logger.warning("ai_service: shared LLM cache read failed: %s", e)
+        return None
+    if text is not None:
+        _llm_cache.set(key, text)
+    return text
+
+
+async def _cache_set(key: str, text: str) -> None:
+    """Store a response in the in-process cache and, best-effort, the shared backend."""
+    _llm_cache.set(key, text)
+    shared = _get_shared_cache()
+    if shared is None:
+        return
+    try:
+        await shared.set(key, text, _llm_cache.ttl_seconds)
+    except Exception as e:
+        utils.logger.warning("ai_service: shared LLM cache write failed: %s", e)
+
+
+async def _call_llm_and_cache(
+    key: str, operation_name: str, system: str, user_content: str, max_tokens: int
+) -> str:
+    """Run one provider call with retries and store the successful result."""
+    provider = _get_provider()
+    text = await with_ai_retry(
+        operation_name,
+        lambda: provider.call_llm(system, user_content, max_tokens=max_tokens),
+    )
+    await _cache_set(key, text)
+    return text
+
+
+def _forget_inflight(key: str, task: "asyncio.Task[str]") -> None:
+    """Drop a finished call from the single-flight map and mark its exception as retrieved."""
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def _cached_call_llm(
+    operation_name: str, system: str, user_content: str, max_tokens: int = 4096
+) -> str:
+    """
+    Call the provider through the LLM response cache and the shared retry helper.
+
+    Concurrent callers with identical inputs share a single in-flight call
+    (single-flight) instead of each paying for their own. The call runs as its
+    own task and callers await it through asyncio.shield, so one client
+    disconnecting doesn't cancel the work the others are waiting on. Only
+    successful responses are cached, so failures are retried next time.
+    """
+    key = LLMCache.make_key(env.MODEL, system, user_content, max_tokens)
+    cached = await _cache_get(key)
+    if cached is not None:
+        utils.logger.debug("ai_service.%s(): LLM cache hit", operation_name)
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _call_llm_and_cache(key, operation_name, system, user_content, max_tokens)
         )
-        _provider = ClaudeProvider()
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _forget_inflight(key, done))
+    else:
+        utils.logger.debug("ai_service.%s(): joining in-flight LLM call", operation_name)
+    return await asyncio.shield(task)
+
+
+async def _stream_llm_and_cache(
+    key: str,
+    operation_name: str,
+    system: str,
+    user_content: str,
+    on_chunk: Callable[[str], Awaitable[None]],
+    max_tokens: int,
+) -> str:
+    """
+    Stream one provider call with retries and store the successful result.
+
+    Retries only happen before the first chunk is forwarded: once text has
+    reached `on_chunk` a restarted generation would repeat it, so a later
+    failure is raised instead.
+    """
+    provider = _get_provider()
+    forwarded = False
+
+    async def forward(delta: str) -> None:
+        nonlocal forwarded
+        forwarded = True
+        await on_chunk(delta)
+
+    text = await with_ai_retry(
+        operation_name,
+        lambda: provider.stream_llm(
+            system,
+            [{"role": "user", "content": user_content}],
+            forward,
+            max_tokens=max_tokens,
+        ),
+        retryable=lambda exc: not forwarded and is_retryable_ai_error(exc),
+        streaming=True,
+    )
+    await _cache_set(key, text)
+    return text
+
+
+async def _cached_stream_llm(
+    operation_name: str,
+    system: str,
+    user_content: str,
+    on_chunk: Callable[[str], Awaitable[None]],
+    max_tokens: int = 4096,
+) -> str:
+    """
+    Streaming counterpart of _cached_call_llm: forwards text chunks as they arrive.
+
+    The stream registers in the same single-flight map, so a cached or
+    already in-flight response for the same inputs is delivered as a single
+    chunk instead of starting another generation.
+    """
+    key = LLMCache.make_key(env.MODEL, system, user_content, max_tokens)
+    cached = await _cache_get(key)
+    if cached is None and key in _inflight:
+        utils.logger.debug("ai_service.%s(): joining in-flight LLM call", operation_name)
+        cached = await asyncio.shield(_inflight[key])
+    if cached is not None:
+        await on_chunk(cached)
+        return cached
 
-    return _provider
+    task = asyncio.create_task(
+        _stream_llm_and_cache(key, operation_name, system, user_content, on_chunk, max_tokens)
+    )
+    _inflight[key] = task
+    task.add_done_callback(lambda done: _forget_inflight(key, done))
+    return await asyncio.shield(task)
 
 
 async def get_files_to_explore(tree_str: str, repo_prefix: str = "") -> List[str]:
@@ -85,33 +296,23 @@ async def get_files_to_explore(tree_str: str, repo_prefix: str = "") -> List[str
     """
     try:
         user_content = build_files_to_explore_user(tree_str)
-        utils.logger.info(
+        utils.logger.debug(
             "ai_service.get_files_to_explore(): Fetching AI-suggested files via provider %s",
             env.AI_PROVIDER,
         )
-        provider = _get_provider()
-        response = await with_ai_retry(
-            "get_files_to_explore",
-            lambda: provider.call_llm(FILES_TO_EXPLORE_SYSTEM, user_content),
+        response = await _cached_call_llm(
+            "get_files_to_explore", FILES_TO_EXPLORE_SYSTEM, user_content
         )
         raw_paths = parse_paths_from_response(response)
 
         if not raw_paths:
             return []
 
-        # Post-process: strip owner/repo prefix, collapse duplicates, deduplicate.
-        cleaned: List[str] = []
-        seen: set[str] = set()
-        for p in raw_paths:
-            norm = _normalize_llm_path(p, repo_prefix)
-            if not norm:
-                continue
-            if norm in seen:
-                continue
-            seen.add(norm)
-            cleaned.append(norm)
-
-        utils.logger.info(
+        # Post-process: strip owner/repo prefix, collapse duplicates, deduplicate (order-preserving).
+        normalized = (_normalize_llm_path(p, repo_prefix) for p in raw_paths)
+        cleaned = list(dict.fromkeys(p for p in normalized if p))
+
+        utils.logger.debug(
             "ai_service.get_files_to_explore(): %d raw paths → %d cleaned paths",
             len(raw_paths),
             len(cleaned),
@@ -129,12 +330,15 @@ async def explain_repo(
     repo_context: str,
     instructions: Optional[str] = None,
     status_callback: Optional[Callable[[str], None]] = None,
+    chunk_callback: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> Tuple[str, bool]:
     """
     Send repo context to the configured provider and get an explanation.
 
     This function keeps the original ClaudeService.explain_repo signature so
     callers in main.py and tests can switch over without logic changes.
+    When `chunk_callback` is given the explanation is streamed and each text
+    delta is passed to it as it arrives; the full text is still returned.
     """
     repo_name = f"{repo.owner}/{repo.repo_name}"
     prompt = build_user_prompt(repo_name, repo_context, instructions)
@@ -143,20 +347,63 @@ async def explain_repo(
         if status_callback:
             status_callback("generating_explanation")
 
-        provider = _get_provider()
-        utils.logger.info(
+        utils.logger.debug(
             "ai_service.explain_repo(): Calling provider %s", env.AI_PROVIDER
         )
-        text = await with_ai_retry(
-            "explain_repo",
-            lambda: provider.call_llm(SYSTEM_PROMPT, prompt, max_tokens=10_000),
-        )
+        if chunk_callback:
+            text = await _cached_stream_llm(
+                "explain_repo", SYSTEM_PROMPT, prompt, chunk_callback, max_tokens=EXPLAIN_MAX_TOKENS
+            )
+        else:
+            text = await _cached_call_llm("explain_repo", SYSTEM_PROMPT, prompt, max_tokens=EXPLAIN_MAX_TOKENS)
         return text, True
     except Exception as e:
         utils.logger.exception("ai_service.explain_repo(): %s", e)
         return str(e), False
 
 
+async def explain_repos_bulk(
+    repos: List[RepoInfo],
+    repo_contexts: List[str],
+    instructions: Optional[str] = None,
+) -> List[Tuple[str, bool]]:
+    """
+    Explain many repositories at once, for offline backfill rather than the request path.
+
+    With Claude the prompts go through the Message Batches API (half the token
+    cost, minutes-to-hours latency); other providers fall back to concurrent
+    explain_repo calls. Successful explanations are stored in the LLM response
+    cache, so a later explain_repo with the same context returns immediately.
+    Results are aligned with `repos` and use explain_repo's (text, success) shape.
+    """
+    pairs = list(zip(repos, repo_contexts, strict=True))
+    provider = _get_provider()
+    if not isinstance(provider, ClaudeProvider):
+        return list(
+            await asyncio.gather(*(explain_repo(repo, ctx, instructions) for repo, ctx in pairs))
+        )
+
+    prompts = [
+        build_user_prompt(f"{repo.owner}/{repo.repo_name}", ctx, instructions) for repo, ctx in pairs
+    ]
+    try:
+        texts = await batch_call_llm(
+            provider, [(SYSTEM_PROMPT, prompt, EXPLAIN_MAX_TOKENS) for prompt in prompts]
+        )
+    except Exception as e:
+        utils.logger.exception("ai_service.explain_repos_bulk(): %s", e)
+        return [(str(e), False)] * len(prompts)
+
+    results: List[Tuple[str, bool]] = []
+    for prompt, text in zip(prompts, texts, strict=True):
+        if text is None:
+            results.append(("Batch request did not succeed", False))
+            continue
+        await _cache_set(LLMCache.make_key(env.MODEL, SYSTEM_PROMPT, prompt, EXPLAIN_MAX_TOKENS), text)
+        results.append((text, True))
+    return results
+
+
 async def suggest_questions(explanation: str, tree: str = "") -> List[str]:
     """
     Ask the configured provider for 3 short follow-up questions based on a
@@ -0,0 +1,51 @@
+"""replace owner/repo indexes with a unique covering index
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, Sequence[str], None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest row per (owner, repo_name, expires_at) so the unique index can be built.
+    op.execute(
+        """
+        DELETE FROM repo_explanations a
+        USING repo_explanations b
+        WHERE a.owner = b.owner
+          AND a.repo_name = b.repo_name
+          AND a.expires_at = b.expires_at
+          AND a.id < b.id
+        """
+    )
+    op.drop_index("idx_owner_repo", table_name="repo_explanations")
+    op.drop_index(op.f("ix_repo_explanations_repo_name"), table_name="repo_explanations")
+    op.drop_index(op.f("ix_repo_explanations_owner"), table_name="repo_explanations")
+    op.create_index(
+        "idx_owner_repo_expires",
+        "repo_explanations",
+        ["owner", "repo_name", sa.text("expires_at DESC")],
+        unique=True,
+        postgresql_include=["directory_hash"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_owner_repo_expires", table_name="repo_explanations")
+    op.create_index(op.f("ix_repo_explanations_owner"), "repo_explanations", ["owner"], unique=False)
+    op.create_index(op.f("ix_repo_explanations_repo_name"), "repo_explanations", ["repo_name"], unique=False)
+    op.create_index("idx_owner_repo", "repo_explanations", ["owner", "repo_name"], unique=False)
@@ -6,7 +6,7 @@ provider and GitHubTools, using conversation history for context.
 import asyncio
 from typing import Any, Awaitable, Callable, Optional, Union
 
-from backend import env, utils
+from backend import ai_service, env, utils
 from backend.ai.providers.base import LLMProvider
 from backend.ai.retry import with_ai_retry
 from backend.chat_tools import CHAT_TOOLS, execute_tool
@@ -19,8 +19,6 @@ ToolCallCallback = Callable[[str, str], Union[None, Awaitable[None]]]
 
 __all__ = ["chat_with_repo"]
 
-_provider: Optional[LLMProvider] = None
-
 
 def _chunk_text(text: str, chunk_size: int = 80) -> list[str]:
     """Split text into UI-friendly chunks for fallback streaming."""
@@ -28,21 +26,8 @@ def _chunk_text(text: str, chunk_size: int = 80) -> list[str]:
 
 
 def _get_provider() -> LLMProvider:
-    """Lazily construct and cache the configured provider."""
-    global _provider
-    if _provider is not None:
-        return _provider
-
-    provider_name = (env.AI_PROVIDER or "claude").strip().lower()
-    if provider_name == "gemini":
-        from backend.ai.providers.gemini import GeminiProvider
-
-        _provider = GeminiProvider()
-    else:
-        from backend.ai.providers.claude import ClaudeProvider
-
-        _provider = ClaudeProvider()
-    return _provider
+    """Share ai_service's cached provider so chat reuses the same pooled client."""
+    return ai_service._get_provider()
 
 
 def _build_messages_from_history(
@@ -187,6 +172,7 @@ async def chat_with_repo(
                 on_chunk=chunk_callback,
                 max_tokens=4096,
             ),
+            streaming=True,
         )
     final = await with_ai_retry(
         "chat_with_repo.final_call_llm_with_tools",
@@ -20,16 +20,25 @@ class RepoExplanation(Base):
     __tablename__ = "repo_explanations"
     
     id = Column(Integer, primary_key=True, index=True)
-    owner = Column(String(255), nullable=False, index=True)
-    repo_name = Column(String(255), nullable=False, index=True)
+    owner = Column(String(255), nullable=False)
+    repo_name = Column(String(255), nullable=False)
     explanation = Column(Text, nullable=False)
     directory_hash = Column(String(64), nullable=True)  # SHA256 hash (64 chars)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     expires_at = Column(DateTime, nullable=False, index=True)
     
-    # Composite index for faster lookups by owner/repo
+    # Lookups are "latest unexpired row for owner/repo": one ordered B-tree descent,
+    # with directory_hash answered from the index itself. The explanation isn't
+    # INCLUDEd because multi-KB text would exceed the B-tree tuple size limit.
     __table_args__ = (
-        Index('idx_owner_repo', 'owner', 'repo_name'),
+        Index(
+            'idx_owner_repo_expires',
+            'owner',
+            'repo_name',
+            expires_at.desc(),
+            unique=True,
+            postgresql_include=['directory_hash'],
+        ),
     )
 
 
@@ -1,16 +1,123 @@
 import asyncio
-from typing import Any, Callable, Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import io
+import itertools
+import random
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+import weakref
 import httpx
 
-from backend import ai_service
+from backend import ai_service, env
+from backend.ai.http import HTTP2_AVAILABLE
 from backend.schema import GitHubApiError, RepoInfo
 from backend import utils
 
 __all__ = ["GitHubTools"]
 
+
+class _TreeIndex(NamedTuple):
+    """What get_repo_context needs from a complete recursive tree, without the raw entries."""
+
+    paths: FrozenSet[str]
+    root_files: FrozenSet[str]
+
+
+# (formatted tree, index or None, resolved default branch or None)
+_TreeResult = Tuple[str, Optional[_TreeIndex], Optional[str]]
+
+# Process-wide cache of formatted trees, shared by every request-scoped GitHubTools:
+# key -> (expires_at, result). Keys include a token hash so a private repo's tree is
+# only served back to callers presenting the same credentials.
+_tree_cache: "OrderedDict[tuple, Tuple[float, _TreeResult]]" = OrderedDict()
+# Single-flight map: cache key -> the one in-flight tree fetch for that key.
+_tree_inflight: Dict[tuple, "asyncio.Task[_TreeResult]"] = {}
+
+
+# Conditional-request cache: (url, params, accept, max_bytes, token hash) ->
+# (ETag, headers, body). A 304 answer to If-None-Match is served from here.
+_etag_cache: "OrderedDict[tuple, Tuple[str, List[Tuple[str, str]], bytes]]" = OrderedDict()
+# Negative cache with the same keys: -> (expires_at, headers, body) of a recent 404,
+# so missing files, paths and repos aren't asked about again within the TTL.
+_not_found_cache: "OrderedDict[tuple, Tuple[float, List[Tuple[str, str]], bytes]]" = OrderedDict()
+
+
+# Process-wide cap on in-flight GitHub requests, on top of each instance's own cap, so
+# many simultaneous users can't burst GitHub or queue on the shared pool (httpx would
+# raise PoolTimeout). One semaphore per event loop: asyncio primitives can't cross loops.
+_process_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _process_semaphore() -> asyncio.Semaphore:
+    """The running loop's process-wide GitHub request semaphore."""
+    loop = asyncio.get_running_loop()
+    semaphore = _process_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _process_semaphores[loop] = asyncio.Semaphore(env.GITHUB_MAX_CONCURRENT_REQUESTS)
+    return semaphore
+
+
+class _SharedGet:
+    """One in-flight GET plus the number of callers still waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[httpx.Response]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+# Single-flight map for identical concurrent GETs (same key as _etag_cache plus the
+# client), so simultaneous crawls of one repo send each request once.
+_get_inflight: Dict[tuple, _SharedGet] = {}
+
+
+def _forget_get_inflight(key: tuple, task: "asyncio.Task[httpx.Response]") -> None:
+    """Drop a finished GET from the single-flight map and mark its exception as retrieved."""
+    shared = _get_inflight.get(key)
+    if shared is not None and shared.task is task:
+        del _get_inflight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+def _decoded_body_headers(response: httpx.Response) -> List[Tuple[str, str]]:
+    """Response headers minus those describing the wire encoding, for re-wrapping a decoded body."""
+    return [
+        (k, v) for k, v in response.headers.multi_items()
+        if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+
+
+def _error_body(response: httpx.Response, limit: int = 512) -> str:
+    """First `limit` bytes of an error body, decoded leniently, for logs and error details."""
+    return response.content[:limit].decode("utf-8", "replace")
+
+
+def _forget_tree_inflight(key: tuple, task: "asyncio.Task[_TreeResult]") -> None:
+    """Drop a finished fetch from the single-flight map and mark its exception as retrieved."""
+    if _tree_inflight.get(key) is task:
+        del _tree_inflight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+def _discard_task(task: "asyncio.Task[Any]") -> None:
+    """Cancel a task whose result is no longer wanted, or mark a finished one's exception as retrieved."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
 class GitHubTools:
 
-    IMPORTANT_FILES = [  # in order of priority
+    # A tuple, not a frozenset: order is the fetch priority. Root files are matched
+    # against it case-insensitively through the rank maps below.
+    IMPORTANT_FILES = (  # in order of priority
         'README.md',
         'package.json',      # Node.js/npm
         'requirements.txt',  # Python
@@ -27,7 +134,15 @@ class GitHubTools:
         'LICENSE',
         'CONTRIBUTING.md',
         'Pipfile',
-    ]
+    )
+    # Lowercased name -> priority rank. Docs whose extension varies by repo
+    # (README.rst, LICENSE.txt, contributing.md) also match on their stem.
+    _IMPORTANT_RANKS = {name.lower(): rank for rank, name in enumerate(IMPORTANT_FILES)}
+    _IMPORTANT_STEM_RANKS = {
+        name.split('.', 1)[0].lower(): rank
+        for rank, name in enumerate(IMPORTANT_FILES)
+        if name.split('.', 1)[0].lower() in ('readme', 'license', 'contributing')
+    }
 
     # SKIP_PATTERNS = [ No need right now since i'm only using allowed list
     #     '__pycache__', 'node_modules', '.git', 'dist', 'build',
@@ -38,8 +153,34 @@ class GitHubTools:
     TREE_DEPTH = 5  # Just top-level structures
     MAX_TOTAL_CHARS = 100_000  # ~25k tokens or 100kb
     MAX_FILE_CHARS = 30_000   # Cap per-file so one huge file (e.g. lockfile) doesn't dominate
+    # Bytes downloaded per file: UTF-8 worst case (4 bytes/char) plus one char, so the
+    # MAX_FILE_CHARS truncation (and its marker) stays exact without fetching whole files.
+    MAX_FILE_BYTES = (MAX_FILE_CHARS + 1) * 4
+    SPECULATIVE_FILES = ('README.md',)  # Fetched alongside the tree, before the root listing is known
     MAX_FILES_TO_FETCH = 25   # Cap merged list (IMPORTANT_FILES + LLM-suggested) for rate limits
     MAX_CONCURRENT_FETCHES = 5  # GitHub's secondary rate limit punishes request bursts
+    RATE_LIMIT_MAX_RETRIES = 3  # Retries of a 403/429 that carries rate-limit headers
+    RATE_LIMIT_MAX_WAIT_S = 60.0  # Longer waits (e.g. hourly quota reset) fail fast instead
+    RATE_LIMIT_JITTER_S = 1.0  # Random extra wait so throttled fetches don't all retry in lockstep
+    TRANSIENT_STATUS_CODES = (502, 503, 504)  # GitHub gateway hiccups that usually clear at once
+    TRANSIENT_MAX_RETRIES = 2
+    TRANSIENT_BACKOFF_S = 0.2  # Doubled per retry: ~0.2s, then ~0.4s
+    # A connection for every request the process-wide cap lets through. Idle connections
+    # outlive httpx's 5s default so the shared client still holds a warm (HTTP/2)
+    # connection when the next user's request arrives.
+    HTTP_LIMITS = httpx.Limits(
+        max_connections=env.GITHUB_MAX_CONCURRENT_REQUESTS,
+        max_keepalive_connections=env.GITHUB_MAX_CONCURRENT_REQUESTS,
+        keepalive_expiry=30.0,
+    )
+    TREE_CACHE_TTL_S = 60.0  # Short: just long enough to absorb bursts and chat turns
+    TREE_CACHE_MAX_ENTRIES = 128
+    TREE_OFFLOAD_BYTES = 1_000_000  # Tree payloads above this are parsed/formatted in a worker thread
+    ETAG_CACHE_MAX_ENTRIES = 512
+    ETAG_CACHE_MAX_BODY_BYTES = 2_000_000  # Don't pin huge tree payloads in memory
+    ETAG_CACHE_MAX_TOTAL_BYTES = 32_000_000  # Bodies across all entries, so the count cap can't add up to ~1GB
+    NOT_FOUND_CACHE_TTL_S = 60.0  # Matches the tree cache, so a file the tree shows isn't still "missing"
+    NOT_FOUND_CACHE_MAX_ENTRIES = 1024
 
     def __init__(
         self, 
@@ -59,6 +200,27 @@ class GitHubTools:
         self.token = github_token
         self.ref = ref
         self._resolved_default_branch: Optional[str] = None
+        # Paths from the last complete recursive tree fetch, reused to list root files
+        # without another /contents round-trip. None when unavailable (empty/truncated tree).
+        self._tree_index: Optional[_TreeIndex] = None
+        # Caps in-flight GitHub requests across every caller sharing this instance.
+        self._request_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+        # Headers are constant per instance; build them once instead of per request.
+        # Treat as read-only: httpx merges them into each request without mutating.
+        self._json_headers = self._get_headers()
+        self._raw_headers = self._get_headers("application/vnd.github.raw+json")
+        self._raw_host_headers = {"Authorization": f"Bearer {github_token}"} if github_token else {}
+        # Identifies the credentials in cache keys without keeping the token itself.
+        self._token_key = hashlib.sha256(github_token.encode()).hexdigest() if github_token else ""
+
+    @classmethod
+    def create_http_client(cls) -> httpx.AsyncClient:
+        """
+        Build the AsyncClient to pass to GitHubTools. Uses HTTP/2 when `h2` is
+        installed, so parallel fetches share one multiplexed connection to
+        api.github.com instead of a TLS handshake each.
+        """
+        return httpx.AsyncClient(follow_redirects=True, http2=HTTP2_AVAILABLE, limits=cls.HTTP_LIMITS)
 
     def _get_headers(self, accept: str = "application/vnd.github.v3+json") -> dict:
         """Build headers dict with optional auth token."""
@@ -70,22 +232,190 @@ class GitHubTools:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
+    def _rate_limit_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None to not retry."""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get("Retry-After")
+        reset = response.headers.get("X-RateLimit-Reset")
+        try:
+            if retry_after is not None:
+                delay = float(retry_after)
+            elif response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+                delay = float(reset) - time.time()
+            elif response.status_code == 429:
+                delay = float(2 ** attempt)
+            else:
+                return None  # a plain 403 (private repo, bad token) won't succeed on retry
+        except ValueError:  # e.g. an HTTP-date Retry-After; not worth parsing for a short wait
+            return None
+        if delay > self.RATE_LIMIT_MAX_WAIT_S:
+            return None
+        # Concurrent fetches throttled together see the same Retry-After/reset, so
+        # without jitter they would all resume at once and trip the limit again.
+        return max(delay, 0.0) + random.uniform(0.0, self.RATE_LIMIT_JITTER_S)
+
+    async def _get_capped(self, url: str, max_bytes: int, **kwargs: Any) -> httpx.Response:
+        """
+        Stream a GET and stop reading after `max_bytes` of (decoded) body, so a
+        multi-MB file costs at most that much bandwidth and memory. Returns a
+        fully-read Response holding just the bytes received.
+        """
+        async with self.client.stream("GET", url, **kwargs) as response:
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+        return httpx.Response(
+            response.status_code,
+            headers=_decoded_body_headers(response),
+            content=bytes(body[:max_bytes]),
+            request=response.request,
+        )
+
+    async def _github_get(self, url: str, max_bytes: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """
+        GET against the GitHub API under the shared concurrency cap, waiting out
+        short rate limits (Retry-After / X-RateLimit-Reset) with backoff.
+        Gateway errors (502/503/504) and dropped connections are retried
+        TRANSIENT_MAX_RETRIES times after a short jittered backoff.
+        The semaphore is released while sleeping so other requests can proceed.
+        With `max_bytes`, only that much of the body is downloaded.
+
+        Successful responses carrying an ETag are remembered; repeating the request
+        sends If-None-Match, and a 304 (no body, no primary rate-limit cost) is
+        answered from the stored copy.
+
+        Identical concurrent GETs share one request. It is only cancelled once
+        every caller waiting on it has been cancelled.
+        """
+        headers = kwargs.get("headers") or {}
+        etag_key = (
+            url,
+            tuple(sorted((kwargs.get("params") or {}).items())),
+            headers.get("Accept"),
+            max_bytes,
+            self._token_key,
+        )
+        inflight_key = (id(self.client), etag_key)
+        shared = _get_inflight.get(inflight_key)
+        if shared is None:
+            task = asyncio.create_task(self._github_get_uncached(url, etag_key, max_bytes, **kwargs))
+            shared = _get_inflight[inflight_key] = _SharedGet(task)
+            task.add_done_callback(lambda done: _forget_get_inflight(inflight_key, done))
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if shared.waiters == 0 and not shared.task.done():
+                # Unregister before cancelling: a caller arriving before the task's
+                # done-callback runs must start a fresh GET, not join a dying one.
+                if _get_inflight.get(inflight_key) is shared:
+                    del _get_inflight[inflight_key]
+                shared.task.cancel()
+
+    async def _github_get_uncached(
+        self, url: str, etag_key: tuple, max_bytes: Optional[int], **kwargs: Any
+    ) -> httpx.Response:
+        """The retrying, ETag-aware GET behind _github_get's single-flight."""
+        missing = _not_found_cache.get(etag_key)
+        if missing is not None:
+            if missing[0] > time.monotonic():
+                _not_found_cache.move_to_end(etag_key)
+                return httpx.Response(404, headers=missing[1], content=missing[2], request=httpx.Request("GET", url))
+            del _not_found_cache[etag_key]
+
+        headers = kwargs.get("headers") or {}
+        stored = _etag_cache.get(etag_key)
+        if stored is not None:
+            kwargs["headers"] = {**headers, "If-None-Match": stored[0]}
+
+        for attempt in range(self.RATE_LIMIT_MAX_RETRIES + 1):
+            try:
+                async with self._request_semaphore, _process_semaphore():
+                    if max_bytes is None:
+                        response = await self.client.get(url, **kwargs)
+                    else:
+                        response = await self._get_capped(url, max_bytes, **kwargs)
+            except (httpx.ReadError, httpx.RemoteProtocolError) as e:
+                if attempt >= self.TRANSIENT_MAX_RETRIES:
+                    raise
+                delay = self._transient_delay(attempt)
+                utils.logger.warning("GitHubTools: %s on %s, retrying in %.2fs", type(e).__name__, url, delay)
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code in self.TRANSIENT_STATUS_CODES and attempt < self.TRANSIENT_MAX_RETRIES:
+                delay = self._transient_delay(attempt)
+                utils.logger.warning(
+                    "GitHubTools: HTTP %d on %s, retrying in %.2fs", response.status_code, url, delay
+                )
+                await asyncio.sleep(delay)
+                continue
+            delay = self._rate_limit_delay(response, attempt)
+            if delay is None or attempt == self.RATE_LIMIT_MAX_RETRIES:
+                if response.status_code == 404:
+                    self._remember_not_found(etag_key, response)
+                return self._apply_etag_cache(etag_key, stored, response)
+            utils.logger.warning(
+                "GitHubTools: rate limited (HTTP %d) on %s, retrying in %.1fs", response.status_code, url, delay
+            )
+            await asyncio.sleep(delay)
+        return response
+
+    def _transient_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff before retrying a 5xx or dropped connection."""
+        return self.TRANSIENT_BACKOFF_S * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    def _apply_etag_cache(
+        self,
+        key: tuple,
+        stored: Optional[Tuple[str, List[Tuple[str, str]], bytes]],
+        response: httpx.Response,
+    ) -> httpx.Response:
+        """Serve a 304 from the stored copy, or remember a fresh 200 that has an ETag."""
+        if response.status_code == 304 and stored is not None:
+            _etag_cache.move_to_end(key)
+            _, headers, body = stored
+            return httpx.Response(200, headers=headers, content=body, request=response.request)
+        etag = response.headers.get("ETag")
+        if response.status_code == 200 and isinstance(etag, str):
+            body = response.content
+            if len(body) <= self.ETAG_CACHE_MAX_BODY_BYTES:
+                _etag_cache[key] = (etag, _decoded_body_headers(response), body)
+                _etag_cache.move_to_end(key)
+                total_bytes = sum(len(entry[2]) for entry in _etag_cache.values())
+                while len(_etag_cache) > self.ETAG_CACHE_MAX_ENTRIES or total_bytes > self.ETAG_CACHE_MAX_TOTAL_BYTES:
+                    _, (_, _, evicted) = _etag_cache.popitem(last=False)
+                    total_bytes -= len(evicted)
+        return response
+
+    def _remember_not_found(self, key: tuple, response: httpx.Response) -> None:
+        """Keep a 404 (with a trimmed body) for NOT_FOUND_CACHE_TTL_S."""
+        body = response.content[:4096]
+        _not_found_cache[key] = (time.monotonic() + self.NOT_FOUND_CACHE_TTL_S, _decoded_body_headers(response), body)
+        _not_found_cache.move_to_end(key)
+        while len(_not_found_cache) > self.NOT_FOUND_CACHE_MAX_ENTRIES:
+            _not_found_cache.popitem(last=False)
+
     async def get_default_branch(self, repo: RepoInfo) -> str:
         """Fetch and memoize the repository default branch."""
         if self._resolved_default_branch:
             return self._resolved_default_branch
 
-        headers = self._get_headers()
+        headers = self._json_headers
         repo_info_url = f"https://api.github.com/repos/{repo.owner}/{repo.repo_name}"
-        repo_info_resp = await self.client.get(repo_info_url, headers=headers)
+        repo_info_resp = await self._github_get(repo_info_url, headers=headers)
         repo_info_resp.raise_for_status()
-        self._resolved_default_branch = repo_info_resp.json().get("default_branch", "main")
+        self._resolved_default_branch = utils.json_loads(repo_info_resp.content).get("default_branch", "main")
         return self._resolved_default_branch
 
     async def get_file_contents(
         self,
         repo: RepoInfo, 
         path: str,
+        max_bytes: Optional[int] = None,
     ) -> tuple[Optional[str], bool]:
         """
         Fetch the contents from github file/directory
@@ -93,6 +423,7 @@ class GitHubTools:
         Args:
             repo: info related to the requested repo to fetch
             path: relative path to the file/directory
+            max_bytes: Optional cap on bytes downloaded; longer files come back truncated
 
         Returns:
             The content of the file/directory as string
@@ -102,19 +433,33 @@ class GitHubTools:
             GitHubApiError: If there's an issue communicating with the GitHub API
                             or if the response is unexpected.
         """
-        headers = self._get_headers("application/vnd.github.raw+json")
+        headers = self._raw_headers
         params = {}
         if self.ref:
             params["ref"] = self.ref
 
         url = f"https://api.github.com/repos/{repo.owner}/{repo.repo_name}/contents/{path}"
+        # raw.githubusercontent.com doesn't spend the REST API rate limit; it only
+        # serves files, so directories and other misses fall back to /contents.
+        raw_ref = self.ref or self._resolved_default_branch or "HEAD"
+        raw_url = f"https://raw.githubusercontent.com/{repo.owner}/{repo.repo_name}/{raw_ref}/{path}"
         
         try:
-            response = await self.client.get(url, headers=headers, params=params, follow_redirects=True)
+            response = await self._github_get(
+                raw_url, max_bytes=max_bytes, headers=self._raw_host_headers, follow_redirects=True
+            )
+            if response.status_code == 200:
+                return response.text, True
+
+            response = await self._github_get(
+                url, max_bytes=max_bytes, headers=headers, params=params, follow_redirects=True
+            )
 
             if response.status_code == 404:
-                error_msg = f"File/Directory not found: {path} in {repo.owner}/{repo.repo_name}@{self.ref or 'default branch'}"
-                utils.logger.info(f"GitHubTools.get_file_contents(): {error_msg}")
+                utils.logger.info(
+                    "GitHubTools.get_file_contents(): File/Directory not found: %s in %s/%s@%s",
+                    path, repo.owner, repo.repo_name, self.ref or 'default branch',
+                )
                 return None, False
             response.raise_for_status()
 
@@ -126,10 +471,13 @@ class GitHubTools:
             return response.text, True
 
         except httpx.HTTPStatusError as e:
-            utils.logger.error(f"GitHub API error fetching file/directory {path}@{self.ref or 'default'}: {e.response.status_code} - {e.response.text}")
-            raise GitHubApiError(f"GitHub API error: {e.response.status_code}", status_code=e.response.status_code, details=e.response.text) from e
+            utils.logger.error(
+                "GitHub API error fetching file/directory %s@%s: %s - %s",
+                path, self.ref or 'default', e.response.status_code, _error_body(e.response),
+            )
+            raise GitHubApiError(f"GitHub API error: {e.response.status_code}", status_code=e.response.status_code, details=_error_body(e.response)) from e
         except Exception as e:
-            utils.logger.error(f"Error fetching or decoding file/directory {path}@{self.ref or 'default'}: {e}")
+            utils.logger.exception("Error fetching or decoding file/directory %s@%s: %s", path, self.ref or 'default', e)
             raise GitHubApiError(f"Failed to process contents: {str(e)}") from e
 
     async def list_directory_files(
@@ -152,7 +500,7 @@ class GitHubTools:
             GitHubApiError: If there's an issue communicating with the GitHub API
                             or if the response is unexpected.
         """
-        headers = self._get_headers()
+        headers = self._json_headers
         params = {}
         if self.ref:
             params["ref"] = self.ref
@@ -162,103 +510,72 @@ class GitHubTools:
         url = f"https://api.github.com/repos/{repo.owner}/{repo.repo_name}/contents/{clean_path}"
         
         try:
-            response = await self.client.get(url, headers=headers, params=params, follow_redirects=True)
+            response = await self._github_get(url, headers=headers, params=params, follow_redirects=True)
 
             if response.status_code == 404:
-                error_msg = f"File/Directory not found: {path} in {repo.owner}/{repo.repo_name}@{self.ref or 'default branch'}"
-                utils.logger.error(f"GitHubTools.list_directory_files(): {error_msg}")
+                utils.logger.error(
+                    "GitHubTools.list_directory_files(): File/Directory not found: %s in %s/%s@%s",
+                    path, repo.owner, repo.repo_name, self.ref or 'default branch',
+                )
                 return None, False
             response.raise_for_status()
 
-            data = response.json()
+            data = utils.json_loads(response.content)
             if isinstance(data, list):  # Directory listing
-                file_list = []
-                for content in data:
-                    if content["type"] == "file":  # get file only, ignore directory
-                        file_list.append(content["path"])
-                return file_list, True
+                # get file only, ignore directory
+                return [content["path"] for content in data if content["type"] == "file"], True
                 
             # else it's a file content (not a list), which isn't what we want here
             return None, False
 
         except httpx.HTTPStatusError as e:
-            utils.logger.error(f"GitHub API error fetching file/directory {path}@{self.ref or 'default'}: {e.response.status_code} - {e.response.text}")
-            raise GitHubApiError(f"GitHub API error: {e.response.status_code}", status_code=e.response.status_code, details=e.response.text) from e
+            utils.logger.error(
+                "GitHub API error fetching file/directory %s@%s: %s - %s",
+                path, self.ref or 'default', e.response.status_code, _error_body(e.response),
+            )
+            raise GitHubApiError(f"GitHub API error: {e.response.status_code}", status_code=e.response.status_code, details=_error_body(e.response)) from e
         except Exception as e:
-            utils.logger.error(f"Error fetching or decoding file/directory {path}@{self.ref or 'default'}: {e}")
+            utils.logger.exception("Error fetching or decoding file/directory %s@%s: %s", path, self.ref or 'default', e)
             raise GitHubApiError(f"Failed to process contents: {str(e)}") from e
 
     @staticmethod
-    def _build_hierarchical_tree(flat_tree_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _collect_tree_nodes(
+        flat_tree_list: List[Dict[str, Any]], max_segments: Optional[int] = None
+    ) -> Dict[tuple, str]:
         """
-        Converts a flat list of GitHub tree entries into a hierarchical
-        nested dictionary structure.
+        Map every path (as a tuple of segments) in a flat GitHub tree listing to its
+        type: the entry's own type ('blob', 'tree', 'commit'), or 'tree' for any
+        path that has children, including parent directories the listing omits.
+        With max_segments, nodes deeper than that are skipped; a deep entry only
+        contributes its (directory) ancestors within the limit.
         """
-        tree_root: Dict[str, Any] = {}
+        nodes: Dict[tuple, str] = {}
         for item in flat_tree_list:
-            path_parts = item.get("path", "").split('/')
-            current_level = tree_root
-            for i, part in enumerate(path_parts):
-                if not part:  # Should not happen with valid GitHub paths
-                    continue
-                
-                is_last_part = (i == len(path_parts) - 1)
-                
-                if is_last_part:
-                    # It's a file or an explicitly listed empty directory from the flat list
-                    current_level[part] = {"_type": item.get("type", "blob")}  # 'blob/file' or 'tree/dir'
-                else:
-                    # It's a directory segment in the path
-                    if part not in current_level:
-                        current_level[part] = {"_type": "tree", "children": {}}
-                    elif "_type" not in current_level[part] or current_level[part]["_type"] not in ("tree", "dir"):
-                        current_level[part] = {"_type": "tree", "children": {}}
-                    
-                    # Ensure 'children' exists if we are treating 'part' as a tree
-                    if "children" not in current_level[part]:
-                        current_level[part]["children"] = {}
-
-                    current_level = current_level[part]["children"]
-        return tree_root
+            path = item.get("path", "")
+            if max_segments is not None and path.count('/') >= max_segments:
+                parts = tuple(part for part in path.split('/', max_segments)[:max_segments] if part)
+                GitHubTools._mark_directories(nodes, parts, len(parts))
+                continue
+            parts = tuple(part for part in path.split('/') if part)
+            if not parts:
+                continue
+            GitHubTools._mark_directories(nodes, parts, len(parts) - 1)
+            nodes.setdefault(parts, item.get("type", "blob"))
+        return nodes
 
     @staticmethod
-    def _format_tree_recursively(
-        tree_node: Dict[str, Any],
-        current_prefix: str,
-        lines_list: List[str],
-        current_depth: int,
-        max_depth: Optional[int]
-    ):
+    def _mark_directories(nodes: Dict[tuple, str], parts: tuple, count: int) -> None:
         """
-        Recursively traverses the hierarchical tree and formats it into a list of strings.
+        Mark the first `count` prefixes of `parts` as directories, deepest first.
+        A prefix is only ever marked together with all of its ancestors, so the walk
+        stops at the first one already marked: siblings share the work instead of
+        re-marking the whole ancestor chain per entry.
         """
-        if max_depth is not None and current_depth >= max_depth:
-            return
-
-        sorted_item_names = sorted(tree_node.keys())
-        
-        for i, name in enumerate(sorted_item_names):
-            item_data = tree_node[name]
-            is_last_child = (i == len(sorted_item_names) - 1)
-            
-            connector = "└── " if is_last_child else "├── "
-            line = current_prefix + connector + name
-            
-            is_directory = item_data.get("_type") == "tree"
-            if is_directory:
-                line += "/"  # Add trailing slash for directories
-            
-            lines_list.append(line)
-            
-            if is_directory and "children" in item_data and item_data["children"]:
-                new_prefix = current_prefix + ("    " if is_last_child else "│   ")
-                GitHubTools._format_tree_recursively(
-                    item_data["children"],
-                    new_prefix,
-                    lines_list,
-                    current_depth + 1,
-                    max_depth
-                )
+        for i in range(count, 0, -1):
+            prefix = parts[:i]
+            if nodes.get(prefix) == "tree":
+                return
+            nodes[prefix] = "tree"
 
     @classmethod
     def _format_github_tree_structure(
@@ -285,8 +602,6 @@ class GitHubTools:
         if not flat_tree_list:
             return f"Directory structure:\n└── {repo_name_with_owner}/\n    (Repository is empty or tree data not available)"
 
-        hierarchical_tree = cls._build_hierarchical_tree(flat_tree_list)
-        
         lines = ["Directory structure:"]
         
         if max_depth is not None and max_depth < 0:
@@ -294,18 +609,28 @@ class GitHubTools:
             return "\n".join(lines)
 
         lines.append(f"└── {repo_name_with_owner}/")
-        
-        effective_max_depth_for_children = None
-        if max_depth is not None:
-            effective_max_depth_for_children = max_depth - 1
-
-        cls._format_tree_recursively(
-            tree_node=hierarchical_tree,
-            current_prefix="    ",
-            lines_list=lines,
-            current_depth=0,
-            max_depth=effective_max_depth_for_children
-        )
+
+        # Depth-first order falls out of sorting segment tuples; a node's last sibling
+        # is simply the last key seen for its parent. No nested dicts, no recursion.
+        # Depth 1 is the root label itself, so children get max_depth - 1 levels.
+        # Truncating while collecting keeps huge monorepo listings from being
+        # split and sorted in full when only the top few levels are shown.
+        max_segments = None if max_depth is None else max(max_depth - 1, 0)
+        nodes = cls._collect_tree_nodes(flat_tree_list, max_segments)
+        ordered = sorted(nodes)
+        last_child = {parts[:-1]: parts for parts in ordered}
+
+        # prefixes[i] is the continuation drawn under the ancestor at depth i.
+        prefixes: List[str] = []
+        for parts in ordered:
+            depth = len(parts) - 1
+            is_last_child = last_child[parts[:-1]] == parts
+            del prefixes[depth:]
+            line = "    " + "".join(prefixes) + ("└── " if is_last_child else "├── ") + parts[-1]
+            if nodes[parts] == "tree":
+                line += "/"  # Add trailing slash for directories
+            lines.append(line)
+            prefixes.append("    " if is_last_child else "│   ")
         
         return "\n".join(lines)
 
@@ -318,6 +643,9 @@ class GitHubTools:
         """
         Fetch the tree from github and format it to be LLM-friendly
 
+        Results are cached for TREE_CACHE_TTL_S per (repo, ref, depth, token), and
+        concurrent identical calls share a single fetch.
+
         Args:
             repo: info related to the requested repo to fetch
             depth: The specified depth of the tree in int
@@ -330,60 +658,190 @@ class GitHubTools:
             GitHubApiError: If there's an issue communicating with the GitHub API
                             or if the response is unexpected.
         """
-        headers = self._get_headers()
-        ref = self.ref
-
-        # 1. Get the ref to use (default branch if None)
+        key = (
+            repo.owner.lower(),
+            repo.repo_name.lower(),
+            self.ref or "",
+            None if full_depth else depth,
+            self._token_key,
+        )
+        cached = _tree_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _tree_cache.move_to_end(key)
+            result = cached[1]
+        else:
+            task = _tree_inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._fetch_and_cache_tree(key, repo, depth, full_depth))
+                _tree_inflight[key] = task
+                task.add_done_callback(lambda done: _forget_tree_inflight(key, done))
+            result = await asyncio.shield(task)
+
+        tree, self._tree_index, default_branch = result
+        if default_branch and not self._resolved_default_branch:
+            self._resolved_default_branch = default_branch
+        return tree
+
+    async def _fetch_and_cache_tree(
+        self, key: tuple, repo: RepoInfo, depth: Optional[int], full_depth: Optional[bool]
+    ) -> _TreeResult:
+        """Fetch a tree from GitHub and store it in the shared tree cache."""
+        tree = await self._fetch_directory_tree_uncached(repo, depth, full_depth)
+        result = (tree, self._tree_index, self._resolved_default_branch)
+        # Expired entries are otherwise only dropped when their own key is looked up.
+        now = time.monotonic()
+        for expired in [k for k, (expires_at, _) in _tree_cache.items() if expires_at <= now]:
+            del _tree_cache[expired]
+        _tree_cache[key] = (now + self.TREE_CACHE_TTL_S, result)
+        _tree_cache.move_to_end(key)
+        while len(_tree_cache) > self.TREE_CACHE_MAX_ENTRIES:
+            _tree_cache.popitem(last=False)
+        return result
+
+    async def _fetch_directory_tree_uncached(
+        self,
+        repo: RepoInfo,
+        depth: Optional[int],
+        full_depth: Optional[bool],
+    ) -> str:
+        """Fetch and format the tree straight from GitHub (no caching)."""
+        # Only a complete recursive listing is indexed; a stale index from an earlier
+        # fetch on this instance must not be cached alongside a different tree.
+        self._tree_index = None
+        headers = self._json_headers
+        ref = self.ref or self._resolved_default_branch
+        tree_resp: Optional[httpx.Response] = None
+
+        # 1. Get the ref to use (default branch if None). While the default branch is
+        # being resolved, speculatively fetch the HEAD tree so the two round-trips overlap.
         if not ref:
-            try:
-                ref = await self.get_default_branch(repo)
-            except Exception as e:
+            head_tree_url = f"https://api.github.com/repos/{repo.owner}/{repo.repo_name}/git/trees/HEAD?recursive=1"
+            branch, head_tree_resp = await asyncio.gather(
+                self.get_default_branch(repo),
+                self._github_get(head_tree_url, headers=headers),
+                return_exceptions=True,
+            )
+            if isinstance(branch, BaseException):
                 raise GitHubApiError(
-                    message=f"Failed to fetch default branch for {repo.owner}/{repo.repo_name}: {str(e)}",
-                    status_code=getattr(e, 'response', None) and getattr(e.response, 'status_code', None)
-                ) from e
-
-        # 2. Get the tree recursively
+                    message=f"Failed to fetch default branch for {repo.owner}/{repo.repo_name}: {str(branch)}",
+                    status_code=getattr(branch, 'response', None) and getattr(branch.response, 'status_code', None)
+                ) from branch
+            ref = branch
+            if not isinstance(head_tree_resp, BaseException) and head_tree_resp.status_code == 200:
+                tree_resp = head_tree_resp
+
+        # 2. Get the tree recursively (unless the speculative HEAD fetch already has it)
         tree_url = f"https://api.github.com/repos/{repo.owner}/{repo.repo_name}/git/trees/{ref}?recursive=1"
 
-        utils.logger.info(f"Fetching tree from: {tree_url}")
         try:
-            tree_resp = await self.client.get(tree_url, headers=headers)
+            if tree_resp is None:
+                utils.logger.debug("Fetching tree from: %s", tree_url)
+                tree_resp = await self._github_get(tree_url, headers=headers)
             
             if tree_resp.status_code == 404:
                 raise GitHubApiError(
                     message=f"Tree or ref '{ref}' not found for {repo.owner}/{repo.repo_name}. Or repository is private/inaccessible.",
                     status_code=404,
-                    details=tree_resp.text
+                    details=_error_body(tree_resp)
                 )
             if tree_resp.status_code == 409:  # Conflict - often for empty repository
-                utils.logger.warning(f"Warning: Received 409 Conflict for tree {repo.owner}/{repo.repo_name}@{ref}. Likely an empty repository.")
+                utils.logger.warning("Warning: Received 409 Conflict for tree %s/%s@%s. Likely an empty repository.", repo.owner, repo.repo_name, ref)
                 return ""
 
             tree_resp.raise_for_status()
             
-            tree_data = tree_resp.json()
-
+            # Big monorepo trees take long enough to parse and format that doing it
+            # inline would stall every other request on the event loop.
+            body = tree_resp.content
+            if len(body) > self.TREE_OFFLOAD_BYTES:
+                tree_data = await asyncio.to_thread(utils.json_loads, body)
+            else:
+                tree_data = utils.json_loads(body)
+
+            entries = tree_data["tree"]
             if tree_data.get("truncated"):
-                utils.logger.warning(f"Warning: Tree data for {repo.owner}/{repo.repo_name}@{ref} was truncated by GitHub API.")
+                utils.logger.warning("Warning: Tree data for %s/%s@%s was truncated by GitHub API.", repo.owner, repo.repo_name, ref)
+                if not full_depth and depth is not None and depth <= self.TREE_DEPTH:
+                    entries = await self._fill_truncated_tree(repo, entries)
+            else:
+                self._tree_index = _TreeIndex(
+                    paths=frozenset(e["path"] for e in entries),
+                    root_files=frozenset(
+                        e["path"] for e in entries if e.get("type") == "blob" and "/" not in e["path"]
+                    ),
+                )
 
-            return self._format_github_tree_structure(
-                tree_data["tree"], 
-                f"{repo.owner}/{repo.repo_name}", 
-                max_depth=None if full_depth else depth
-            )
+            format_args = (entries, f"{repo.owner}/{repo.repo_name}", None if full_depth else depth)
+            if len(body) > self.TREE_OFFLOAD_BYTES:
+                return await asyncio.to_thread(self._format_github_tree_structure, *format_args)
+            return self._format_github_tree_structure(*format_args)
 
         except httpx.HTTPStatusError as e:
             raise GitHubApiError(
                 message=f"GitHub API HTTP error fetching tree for {repo.owner}/{repo.repo_name}@{ref}: {e.response.status_code}",
                 status_code=e.response.status_code,
-                details=e.response.text
+                details=_error_body(e.response)
             ) from e
         except httpx.RequestError as e:
             raise GitHubApiError(message=f"HTTP request failed while fetching tree for {repo.owner}/{repo.repo_name}@{ref}: {str(e)}") from e
+        except GitHubApiError:
+            raise  # already carries its status code (e.g. the 404 above)
         except Exception as e:
             raise GitHubApiError(message=f"An unexpected error occurred while fetching tree for {repo.owner}/{repo.repo_name}@{ref}: {str(e)}") from e
 
+    async def _fill_truncated_tree(self, repo: RepoInfo, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Patch a truncated recursive tree with one /contents listing per top-level
+        directory (fetched in parallel), so files the LLM may suggest at shallow
+        depth are actually listed. Only files directly under each top-level
+        directory are recovered, not anything in its subdirectories. At most
+        MAX_FILES_TO_FETCH directories are listed, so a repo with hundreds of them
+        can't fan out into hundreds of requests. Listings that fail are skipped.
+        """
+        root_dirs = [e["path"] for e in entries if e.get("type") == "tree" and "/" not in e.get("path", "")]
+        if not root_dirs:
+            return entries
+        if len(root_dirs) > self.MAX_FILES_TO_FETCH:
+            utils.logger.warning(
+                "GitHubTools._fill_truncated_tree(): listing %d of %d top-level directories",
+                self.MAX_FILES_TO_FETCH, len(root_dirs),
+            )
+            root_dirs = root_dirs[:self.MAX_FILES_TO_FETCH]
+        listings = await asyncio.gather(
+            *(self.list_directory_files(repo, d) for d in root_dirs), return_exceptions=True
+        )
+        extra: List[Dict[str, Any]] = []
+        for directory, listing in zip(root_dirs, listings, strict=True):
+            if isinstance(listing, BaseException):
+                utils.logger.warning("GitHubTools._fill_truncated_tree(): skipping %s: %s", directory, listing)
+                continue
+            files, success = listing
+            if success and files:
+                extra.extend({"path": f, "type": "blob"} for f in files)
+        # Duplicates of entries already in the truncated tree are merged by the formatter.
+        return entries + extra
+
+    @classmethod
+    def _important_root_files(cls, files_at_root: set[str]) -> List[str]:
+        """
+        Root files matching IMPORTANT_FILES, ignoring case, in priority order, with
+        their actual repo casing. At most one file per entry; a full-name match
+        (LICENSE) beats a stem match (LICENSE.txt).
+        """
+        best: Dict[int, Tuple[bool, str]] = {}
+        for name in files_at_root:
+            lower = name.lower()
+            rank = cls._IMPORTANT_RANKS.get(lower)
+            stem_only = rank is None
+            if stem_only:
+                rank = cls._IMPORTANT_STEM_RANKS.get(lower.split('.', 1)[0])
+                if rank is None:
+                    continue
+            candidate = (stem_only, name)
+            if rank not in best or candidate < best[rank]:
+                best[rank] = candidate
+        return [best[rank][1] for rank in sorted(best)]
+
     @staticmethod
     def _count_tree_files(tree_str: str) -> int:
         """Count file entries (non-directory lines) in a formatted tree string, for analytics."""
@@ -406,83 +864,131 @@ class GitHubTools:
             Int count of files actually read into the context (for analytics)
             Int count of file fetches that failed with an exception, e.g. rate
                 limits/timeouts — 404s excluded (for analytics)
+
+        Raises:
+            GitHubApiError: With a 4xx status_code when the repository (or ref)
+                            itself is missing, private or rate limited, so callers
+                            can report that instead of a generic failure.
         """
         tree_file_count = 0
         try:
-            context_parts = []
+            # Written straight into one buffer (parts separated by a blank line)
+            # instead of collecting a list and joining it at the end.
+            context = io.StringIO()
             total_chars = 0
 
-            # Context #1: Repo structure
-            if status_callback:
-                status_callback("fetching_tree")
-            tree = await self.fetch_directory_tree_with_depth(repo=repo, depth=self.TREE_DEPTH)
-            tree_file_count = self._count_tree_files(tree)
-            if len(tree) > 10000:
-                tree = "(Tree content cropped to 10k characters)\n" + tree[:10000]
-            context_parts.append(tree + "\n")
-            total_chars += len(tree)
-
-            # Context #2: File content (agentic: LLM suggests paths + IMPORTANT_FILES, fetch in parallel)
-            result = await self.list_directory_files(repo, "")
-            if not result[1]:
-                return "Error with getting files at root directory", False, tree_file_count, 0, 0
-
-            # An empty list here is a legitimate result (e.g. root holds only
-            # subdirectories), not a failure — fall through to the LLM-suggested
-            # paths instead of aborting the whole pipeline.
-            files_at_root = set(result[0] or [])
-            root_important = [f for f in self.IMPORTANT_FILES if f in files_at_root]
-
-            if status_callback:
-                status_callback("exploring_files")
-            llm_paths = await ai_service.get_files_to_explore(
-                tree, repo_prefix=f"{repo.owner}/{repo.repo_name}"
-            )
-            all_paths = list(dict.fromkeys(root_important + llm_paths))[: self.MAX_FILES_TO_FETCH]
-
-            if not all_paths:
-                return "No key documentation files found in root.", True, tree_file_count, 0, 0
-
-            if status_callback:
-                status_callback("fetching_files")
-            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
-
-            async def fetch_with_limit(path: str):
-                async with semaphore:
-                    return await self.get_file_contents(repo, path)
-
-            # return_exceptions so one flaky fetch (403/timeout) skips that file
-            # instead of discarding the whole context.
-            results = await asyncio.gather(
-                *(fetch_with_limit(p) for p in all_paths), return_exceptions=True
-            )
-            files_failed_count = sum(1 for r in results if isinstance(r, BaseException))
-
-            for path, result in zip(all_paths, results):
-                if isinstance(result, BaseException):
-                    utils.logger.warning(f"get_repo_context: skipping {path}: {result}")
-                    continue
-                content, success = result
-                if success and content:
-                    if len(content) > self.MAX_FILE_CHARS:
-                        content = content[: self.MAX_FILE_CHARS] + "\n... (file truncated for length)\n"
-                    add_len = len(content)
-                    if total_chars + add_len > self.MAX_TOTAL_CHARS:
-                        context_parts.append("(Remaining files skipped to stay under context limit.)\n")
-                        break
-                    context_parts.append(f"================================================\nFILE: {path}\n================================================\n{content}\n")
-                    total_chars += add_len
-
-            return "\n".join(context_parts), True, tree_file_count, len(all_paths), files_failed_count
-
+            # README.md sits at the root of nearly every repo, so request it alongside the
+            # tree rather than after it. The rest of IMPORTANT_FILES wait for the root
+            # listing so absent ones don't each burn a 404 against the rate limit.
+            fetch_tasks = {
+                p: asyncio.create_task(self.get_file_contents(repo, p, max_bytes=self.MAX_FILE_BYTES))
+                for p in self.SPECULATIVE_FILES
+            }
+            try:
+                # Context #1: Repo structure
+                if status_callback:
+                    status_callback("fetching_tree")
+                tree = await self.fetch_directory_tree_with_depth(repo=repo, depth=self.TREE_DEPTH)
+                tree_file_count = self._count_tree_files(tree)
+                if len(tree) > 10000:
+                    tree = "(Tree content cropped to 10k characters)\n" + tree[:10000]
+                context.write(tree + "\n")
+                total_chars += len(tree)
+
+                # Context #2: File content (agentic: LLM suggests paths + IMPORTANT_FILES, fetch in parallel)
+                # The recursive tree already lists the root files; only ask /contents when it
+                # wasn't usable (empty repo or truncated tree).
+                if self._tree_index is not None:
+                    files_at_root = set(self._tree_index.root_files)
+                else:
+                    result = await self.list_directory_files(repo, "")
+                    if not result[1]:
+                        return "Error with getting files at root directory", False, tree_file_count, 0, 0
+                    # An empty list here is a legitimate result (e.g. root holds only
+                    # subdirectories), not a failure — fall through to the LLM-suggested
+                    # paths instead of aborting the whole pipeline.
+                    files_at_root = set(result[0] or [])
+                root_important = self._important_root_files(files_at_root)
+
+                # The important root files don't depend on the LLM's suggestions, so start
+                # fetching them while it decides; only its extra paths wait for the answer.
+                # Concurrency is capped by the request semaphore inside _github_get.
+                for p in root_important:
+                    if p not in fetch_tasks:
+                        fetch_tasks[p] = asyncio.create_task(self.get_file_contents(repo, p, max_bytes=self.MAX_FILE_BYTES))
+
+                if status_callback:
+                    status_callback("exploring_files")
+                llm_paths = await ai_service.get_files_to_explore(
+                    tree, repo_prefix=f"{repo.owner}/{repo.repo_name}"
+                )
+                # A complete tree already says which suggestions don't exist; asking
+                # GitHub about them would only cost a raw 404 plus an API 404 each.
+                if self._tree_index is not None:
+                    llm_paths = [p for p in llm_paths if p in self._tree_index.paths]
+                # Important files first, then LLM picks; one dedup pass that stops at the cap.
+                all_paths: List[str] = []
+                seen: set[str] = set()
+                for p in itertools.chain(root_important, llm_paths):
+                    if p not in seen:
+                        seen.add(p)
+                        all_paths.append(p)
+                        if len(all_paths) == self.MAX_FILES_TO_FETCH:
+                            break
+
+                if not all_paths:
+                    return "No key documentation files found in root.", True, tree_file_count, 0, 0
+
+                if status_callback:
+                    status_callback("fetching_files")
+                for p in all_paths:
+                    if p not in fetch_tasks:
+                        fetch_tasks[p] = asyncio.create_task(self.get_file_contents(repo, p, max_bytes=self.MAX_FILE_BYTES))
+
+                # Consume results in priority order; once the context budget is spent,
+                # break out and let the finally cancel fetches that haven't run yet.
+                files_read_count = 0
+                files_failed_count = 0
+                for path in all_paths:
+                    try:
+                        content, success = await fetch_tasks[path]
+                    except Exception as e:
+                        # One flaky fetch (403/timeout) skips that file instead of
+                        # discarding the whole context.
+                        files_failed_count += 1
+                        utils.logger.warning("get_repo_context: skipping %s: %s", path, e)
+                        continue
+                    if success and content:
+                        if len(content) > self.MAX_FILE_CHARS:
+                            content = content[: self.MAX_FILE_CHARS] + "\n... (file truncated for length)\n"
+                        add_len = len(content)
+                        if total_chars + add_len > self.MAX_TOTAL_CHARS:
+                            context.write("\n(Remaining files skipped to stay under context limit.)\n")
+                            break
+                        context.write(f"\n================================================\nFILE: {path}\n================================================\n{content}\n")
+                        total_chars += add_len
+                        files_read_count += 1
+            finally:
+                # Stops queued fetches once the budget is spent (or on error), and
+                # settles finished ones nobody awaited, e.g. a README not at the root.
+                for task in fetch_tasks.values():
+                    _discard_task(task)
+
+            return context.getvalue(), True, tree_file_count, files_read_count, files_failed_count
+
+        except GitHubApiError as e:
+            if e.status_code is not None and 400 <= e.status_code < 500:
+                raise
+            utils.logger.error("GitHubTools.get_repo_context(): %s", e)
+            return str(e), False, tree_file_count, 0, 0
         except Exception as e:
-            utils.logger.error(f"GitHubTools.get_repo_context(): {e}")
+            utils.logger.exception("GitHubTools.get_repo_context(): %s", e)
             return str(e), False, tree_file_count, 0, 0
 
 
 # For testing
 async def main():
-    async with httpx.AsyncClient(follow_redirects=True) as client:
+    async with GitHubTools.create_http_client() as client:
         github = GitHubTools(client, github_token=None, ref=None)
         repo = RepoInfo(owner="baonguyen09", repo_name="github-second-brain")
         content, success, _tree_file_count, _files_read_count, _files_failed_count = await github.get_repo_context(repo)
@@ -1,5 +1,6 @@
 import asyncio
 from collections import defaultdict, deque
+from contextlib import asynccontextmanager
 import json
 import re
 import time
@@ -19,7 +20,8 @@ from backend import GitHubTools
 from backend import ai_service
 from backend import chat_service
 from backend import env, utils
-from backend.schema import ModelResponse, RepoInfo, SuggestedQuestionsRequest
+from backend.ai.cache import LLMCache
+from backend.schema import GitHubApiError, ModelResponse, RepoInfo, SuggestedQuestionsRequest
 
 # —— PostHog analytics (no-op when API key is absent) ——
 posthog_client: Posthog | None = None
@@ -152,20 +154,52 @@ def _track_chat_message(
         utils.logger.exception("track_event: failed to capture chat_message")
 
 
+# Known API/backend error shapes and the message shown instead, checked in order.
+_USER_FACING_ERRORS: tuple[tuple[re.Pattern[str], str], ...] = (
+    (
+        re.compile(r"prompt is too long|too long.*token|token.*too long", re.IGNORECASE | re.DOTALL),
+        "This repository has too much content to analyze (over the model's limit). Try a smaller repo or a specific branch.",
+    ),
+    (
+        re.compile(r"connection.*failed|failed.*connection", re.IGNORECASE | re.DOTALL),
+        "Could not reach the AI service. Check your connection or try again in a moment.",
+    ),
+    (re.compile(r"rate limit|429", re.IGNORECASE), "Rate limit exceeded. Please try again later."),
+)
+
+
 def _user_facing_error(msg: str) -> str:
     """Map known API/backend errors to user-friendly messages; pass through the rest."""
     if not msg:
         return "Something went wrong. Please try again."
-    msg_lower = msg.lower()
-    if "prompt is too long" in msg_lower or ("too long" in msg_lower and "token" in msg_lower):
-        return "This repository has too much content to analyze (over the model's limit). Try a smaller repo or a specific branch."
-    if "connection" in msg_lower and "failed" in msg_lower:
-        return "Could not reach the AI service. Check your connection or try again in a moment."
-    if "rate limit" in msg_lower or "429" in msg:
-        return "Rate limit exceeded. Please try again later."
+    for pattern, friendly in _USER_FACING_ERRORS:
+        if pattern.search(msg):
+            return friendly
     return msg
 
 
+def _github_error_status(e: Exception) -> Optional[int]:
+    """HTTP status of a GitHub error raised while fetching the repo, or None for other errors."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code
+    if isinstance(e, GitHubApiError):
+        return e.status_code
+    return None
+
+
+def _github_error_detail(owner: str, repo: str, status_code: int) -> str:
+    """User-facing message for a GitHub error status about the requested repository."""
+    error_messages = {
+        403: f"Repository '{owner}/{repo}' is private or access is forbidden.",
+        404: f"Repository '{owner}/{repo}' not found. Please check the owner and repository name.",
+        429: "Too many requests to GitHub. Please try again later.",
+    }
+    return error_messages.get(
+        status_code,
+        f"Error accessing repository '{owner}/{repo}' (HTTP {status_code})",
+    )
+
+
 def _validate_chat_style(style: Any) -> str:
     """Validate the requested chat style."""
     if style in (None, "", "normal"):
@@ -225,8 +259,94 @@ def _is_chat_rate_limited(client_id: str) -> bool:
     return False
 
 
+# Finished responses, so a repeat request for the same repo skips the GitHub fetch as well as the model.
+_explanation_cache = LLMCache(
+    max_entries=env.EXPLANATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=env.EXPLANATION_CACHE_TTL_SECONDS,
+)
+
+
+def _explanation_cache_key(
+    request: Request,
+    endpoint: str,
+    owner: str,
+    repo: str,
+    ref: Optional[str],
+    instructions: Optional[str],
+) -> Optional[str]:
+    """Response-cache key for an explain request, or None when the response must not be shared."""
+    # A caller's own token may reach repos other callers can't see.
+    if request.headers.get("X-GitHub-Token"):
+        return None
+    return "\n".join((endpoint, owner.lower(), repo.lower(), ref or "", (instructions or "").strip()))
+
+
+def _get_cached_explanation(key: Optional[str]) -> Optional[ModelResponse]:
+    """Return the cached response for `key`, flagged as a cache hit, or None."""
+    if key is None:
+        return None
+    data = _explanation_cache.get(key)
+    return ModelResponse.model_validate_json(data) if data is not None else None
+
+
+def _set_cached_explanation(key: Optional[str], response: ModelResponse) -> None:
+    """Remember a successful response under `key` (no-op for unshareable requests)."""
+    if key is not None:
+        _explanation_cache.set(key, response.model_copy(update={"cache": True}).model_dump_json())
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide pooled client for GitHub calls, built on first use, so keep-alive
+    connections (and their TLS sessions) carry over between requests instead of
+    being opened and torn down by each one.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = GitHubTools.create_http_client()
+    return _http_client
+
+
+async def _aclose_http_client() -> None:
+    """Close the shared GitHub client, if one was built."""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the provider connection on startup and close pooled clients (provider,
+    shared LLM cache, GitHub HTTP client) on shutdown.
+
+    The warm-up runs in the background so a slow or unreachable provider never
+    delays the app from accepting requests.
+    """
+    warmup_task = asyncio.create_task(ai_service.warm_up_provider()) if env.AI_PROVIDER_WARMUP else None
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()  # no-op once it has finished
+    try:
+        await ai_service.aclose_provider()
+    except Exception:
+        utils.logger.exception("lifespan: failed to close AI provider client")
+    try:
+        await ai_service.aclose_shared_cache()
+    except Exception:
+        utils.logger.exception("lifespan: failed to close shared LLM cache")
+    try:
+        await _aclose_http_client()
+    except Exception:
+        utils.logger.exception("lifespan: failed to close GitHub HTTP client")
+
+
 limiter = Limiter(key_func=get_remote_address)
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -256,6 +376,15 @@ def root():
     return "Welcome to Repo Explainer!"
 
 
+@app.get("/metrics")
+def metrics():
+    """In-process cache counters for this worker."""
+    return {
+        "llm_cache": ai_service.llm_cache_stats(),
+        "explanation_cache": _explanation_cache.snapshot(),
+    }
+
+
 @app.get(
     "/{owner}/{repo}",
     responses={
@@ -278,25 +407,38 @@ async def explain_repo(
     files_read_count: Optional[int] = None
     files_failed_count: Optional[int] = None
     explanation_chars: Optional[int] = None
-    stage = "github_validation"  # advanced as the pipeline progresses; reported on error
+    stage = "context_fetch"  # advanced as the pipeline progresses; reported on error
+    cache_key = _explanation_cache_key(request, "explain", owner, repo, ref, instructions)
+    cached = _get_cached_explanation(cache_key)
+    if cached is not None:
+        track_event(
+            request, owner, repo, "explain", "cache_hit",
+            duration_ms=(time.perf_counter() - start) * 1000,
+            explanation_chars=len(cached.explanation),
+            instructions_present=instructions_present,
+        )
+        return cached
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            res = await client.get(f"https://github.com/{owner}/{repo}")
-            res.raise_for_status()
-
-            repo_info = RepoInfo(owner=owner, repo_name=repo)
-            github_token = request.headers.get("X-GitHub-Token") or env.GITHUB_TOKEN
-            if github_token == "":
-                github_token = None
-
-            github = GitHubTools(client, github_token=github_token, ref=ref)
-            default_branch = await github.get_default_branch(repo_info)
-            stage = "context_fetch"
-            repo_content, success, tree_file_count, files_read_count, files_failed_count = await github.get_repo_context(repo_info)
-            if not success:
-                raise HTTPException(status_code=500, detail="Failed to fetch repository context")
-
-            stage = "ai_generation"
+        client = _get_http_client()
+        repo_info = RepoInfo(owner=owner, repo_name=repo)
+        github_token = request.headers.get("X-GitHub-Token") or env.GITHUB_TOKEN
+
+        # A missing or private repo surfaces as a 4xx from the first API call.
+        github = GitHubTools(client, github_token=github_token, ref=ref)
+        repo_content, success, tree_file_count, files_read_count, files_failed_count = await github.get_repo_context(repo_info)
+        if not success:
+            raise HTTPException(status_code=500, detail="Failed to fetch repository context")
+        # Memoized by the tree fetch, which resolves it alongside a speculative HEAD tree.
+        default_branch = await github.get_default_branch(repo_info)
+
+        stage = "ai_generation"
+        # The suggestions tree doesn't depend on the explanation, so fetch it
+        # while the model is generating instead of after.
+        suggestions_tree_task = asyncio.create_task(
+            github.fetch_directory_tree_with_depth(repo_info, depth=3)
+        )
+        suggestions_tree_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
             explanation, success = await ai_service.explain_repo(
                 repo_info,
                 repo_content,
@@ -322,30 +464,26 @@ async def explain_repo(
 
             suggested_questions: list[str] = []
             try:
-                tree = await github.fetch_directory_tree_with_depth(repo_info, depth=3)
+                tree = await suggestions_tree_task
                 suggested_questions = await ai_service.suggest_questions(explanation, tree)
             except Exception:
                 utils.logger.exception("Failed to generate suggested questions for %s/%s", owner, repo)
-
-            return ModelResponse(
-                explanation=explanation,
-                repo=f"{owner}/{repo}",
-                cache=False,
-                timestamp=utils.date_now(),
-                default_branch=default_branch,
-                suggested_questions=suggested_questions,
-            )
-    except httpx.HTTPStatusError as e:
-        status_code = e.response.status_code
-        error_messages = {
-            403: f"Repository '{owner}/{repo}' is private or access is forbidden.",
-            404: f"Repository '{owner}/{repo}' not found. Please check the owner and repository name.",
-            429: "Too many requests to GitHub. Please try again later.",
-        }
-        detail = error_messages.get(
-            status_code,
-            f"Error accessing repository '{owner}/{repo}' (HTTP {status_code})",
+        finally:
+            suggestions_tree_task.cancel()  # no-op once it has finished
+
+        response = ModelResponse(
+            explanation=explanation,
+            repo=f"{owner}/{repo}",
+            cache=False,
+            timestamp=utils.date_now(),
+            default_branch=default_branch,
+            suggested_questions=suggested_questions,
         )
+        _set_cached_explanation(cache_key, response)
+        return response
+    except (httpx.HTTPStatusError, GitHubApiError) as e:
+        status_code = _github_error_status(e) or status.HTTP_500_INTERNAL_SERVER_ERROR
+        detail = _github_error_detail(owner, repo, status_code)
 
         duration_ms = (time.perf_counter() - start) * 1000
         track_event(
@@ -383,10 +521,17 @@ async def explain_repo(
 
 def _sse_event(event_type: str, data: Any) -> str:
     """Format one SSE event (event type + data line, double newline)."""
-    payload = json.dumps(data) if not isinstance(data, str) else data
+    payload = utils.json_dumps(data).decode() if not isinstance(data, str) else data
     return f"event: {event_type}\ndata: {payload}\n\n"
 
 
+def _sse_result_data(result: ModelResponse) -> dict[str, Any]:
+    """Payload of the final SSE `result` event."""
+    data = result.model_dump()
+    data["timestamp"] = result.timestamp.isoformat()
+    return data
+
+
 async def _run_stream_pipeline(
     owner: str,
     repo: str,
@@ -402,92 +547,94 @@ async def _run_stream_pipeline(
     tree_file_count: Optional[int] = None
     files_read_count: Optional[int] = None
     files_failed_count: Optional[int] = None
-    pipeline_stage = "github_validation"  # advanced as the pipeline progresses; reported on error
+    pipeline_stage = "context_fetch"  # advanced as the pipeline progresses; reported on error
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            repo_info = RepoInfo(owner=owner, repo_name=repo)
-            github_token = request.headers.get("X-GitHub-Token") or env.GITHUB_TOKEN
-            if github_token == "":
-                github_token = None
-            github = GitHubTools(client, github_token=github_token, ref=ref)
-            default_branch = await github.get_default_branch(repo_info)
-
-            def status_callback(stage: str) -> None:
-                nonlocal first_event_ms
-                if first_event_ms is None:
-                    first_event_ms = (time.perf_counter() - start) * 1000
-                queue.put_nowait(stage)
-
-            pipeline_stage = "context_fetch"
-            repo_content, success, tree_file_count, files_read_count, files_failed_count = await github.get_repo_context(
-                repo_info, status_callback=status_callback
-            )
-            if not success:
-                track_event(
-                    request, owner, repo, "stream", "error",
-                    duration_ms=(time.perf_counter() - start) * 1000,
-                    time_to_first_event_ms=first_event_ms,
-                    tree_file_count=tree_file_count,
-                    files_read_count=files_read_count,
-                    instructions_present=instructions_present,
-                    error_stage=pipeline_stage,
-                )
-                queue.put_nowait({"error": "Failed to fetch repository context"})
-                return
-
-            pipeline_stage = "ai_generation"
-            explanation, success = await ai_service.explain_repo(
-                repo_info,
-                repo_content,
-                instructions=instructions,
-                status_callback=status_callback,
+        client = _get_http_client()
+        repo_info = RepoInfo(owner=owner, repo_name=repo)
+        github_token = request.headers.get("X-GitHub-Token") or env.GITHUB_TOKEN
+        github = GitHubTools(client, github_token=github_token, ref=ref)
+
+        def status_callback(stage: str) -> None:
+            nonlocal first_event_ms
+            if first_event_ms is None:
+                first_event_ms = (time.perf_counter() - start) * 1000
+            queue.put_nowait(stage)
+
+        async def chunk_callback(delta: str) -> None:
+            queue.put_nowait({"chunk": delta})
+
+        repo_content, success, tree_file_count, files_read_count, files_failed_count = await github.get_repo_context(
+            repo_info, status_callback=status_callback
+        )
+        if not success:
+            track_event(
+                request, owner, repo, "stream", "error",
+                duration_ms=(time.perf_counter() - start) * 1000,
+                time_to_first_event_ms=first_event_ms,
+                tree_file_count=tree_file_count,
+                files_read_count=files_read_count,
+                instructions_present=instructions_present,
+                error_stage=pipeline_stage,
             )
-            if not success:
-                track_event(
-                    request, owner, repo, "stream", "error",
-                    duration_ms=(time.perf_counter() - start) * 1000,
-                    time_to_first_event_ms=first_event_ms,
-                    tree_file_count=tree_file_count,
-                    files_read_count=files_read_count,
-                    instructions_present=instructions_present,
-                    error_stage=pipeline_stage,
-                )
-                queue.put_nowait({"error": _user_facing_error(explanation or "Failed to generate explanation")})
-                return
-
-            duration_ms = (time.perf_counter() - start) * 1000
+            queue.put_nowait({"error": "Failed to fetch repository context"})
+            return
+        # Memoized by the tree fetch, which resolves it alongside a speculative HEAD tree.
+        default_branch = await github.get_default_branch(repo_info)
+
+        pipeline_stage = "ai_generation"
+        explanation, success = await ai_service.explain_repo(
+            repo_info,
+            repo_content,
+            instructions=instructions,
+            status_callback=status_callback,
+            chunk_callback=chunk_callback,
+        )
+        if not success:
             track_event(
-                request, owner, repo, "stream", "success",
-                duration_ms=duration_ms,
+                request, owner, repo, "stream", "error",
+                duration_ms=(time.perf_counter() - start) * 1000,
                 time_to_first_event_ms=first_event_ms,
                 tree_file_count=tree_file_count,
                 files_read_count=files_read_count,
-                files_failed_count=files_failed_count,
-                explanation_chars=len(explanation),
                 instructions_present=instructions_present,
+                error_stage=pipeline_stage,
             )
+            queue.put_nowait({"error": _user_facing_error(explanation or "Failed to generate explanation")})
+            return
 
-            # Chat suggestions are fetched separately by the client (POST
-            # /{owner}/{repo}/suggested-questions) right after this event lands,
-            # instead of being generated here — that used to add an extra tree
-            # fetch + LLM call to every explain request before the overview
-            # could even be shown.
-            queue.put_nowait(
-                {
-                    "done": True,
-                    "result": ModelResponse(
-                        explanation=explanation,
-                        repo=f"{owner}/{repo}",
-                        cache=False,
-                        timestamp=utils.date_now(),
-                        default_branch=default_branch,
-                        suggested_questions=[],
-                    ),
-                }
-            )
+        duration_ms = (time.perf_counter() - start) * 1000
+        track_event(
+            request, owner, repo, "stream", "success",
+            duration_ms=duration_ms,
+            time_to_first_event_ms=first_event_ms,
+            tree_file_count=tree_file_count,
+            files_read_count=files_read_count,
+            files_failed_count=files_failed_count,
+            explanation_chars=len(explanation),
+            instructions_present=instructions_present,
+        )
+
+        # Chat suggestions are fetched separately by the client (POST
+        # /{owner}/{repo}/suggested-questions) right after this event lands,
+        # instead of being generated here — that used to add an extra tree
+        # fetch + LLM call to every explain request before the overview
+        # could even be shown.
+        result = ModelResponse(
+            explanation=explanation,
+            repo=f"{owner}/{repo}",
+            cache=False,
+            timestamp=utils.date_now(),
+            default_branch=default_branch,
+            suggested_questions=[],
+        )
+        _set_cached_explanation(
+            _explanation_cache_key(request, "stream", owner, repo, ref, instructions), result
+        )
+        queue.put_nowait({"done": True, "result": result})
     except Exception as e:
         utils.logger.exception("Stream pipeline error: %s", e)
         duration_ms = (time.perf_counter() - start) * 1000
+        github_status = _github_error_status(e)
         track_event(
             request, owner, repo, "stream", "error",
             duration_ms=duration_ms,
@@ -496,9 +643,12 @@ async def _run_stream_pipeline(
             files_read_count=files_read_count,
             instructions_present=instructions_present,
             error_stage=pipeline_stage,
-            error_type=type(e).__name__,
+            error_type=f"HTTP{github_status}" if github_status else type(e).__name__,
         )
-        queue.put_nowait({"error": str(e)})
+        if github_status:
+            queue.put_nowait({"error": _github_error_detail(owner, repo, github_status)})
+        else:
+            queue.put_nowait({"error": str(e)})
 
 
 async def _stream_generator(
@@ -508,24 +658,15 @@ async def _stream_generator(
     instructions: Optional[str],
     request: Request,
 ) -> Any:
-    """Yield SSE events: status (stage), then result or error."""
-    yield _sse_event("status", {"stage": "validating"})
-    try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            res = await client.get(f"https://github.com/{owner}/{repo}")
-            res.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        status_code = e.response.status_code
-        error_messages = {
-            403: f"Repository '{owner}/{repo}' is private or access is forbidden.",
-            404: f"Repository '{owner}/{repo}' not found. Please check the owner and repository name.",
-            429: "Too many requests to GitHub. Please try again later.",
-        }
-        detail = error_messages.get(status_code, f"Error accessing repository (HTTP {status_code})")
-        yield _sse_event("error", {"detail": detail})
-        return
-    except Exception:
-        yield _sse_event("error", {"detail": "Could not validate repository."})
+    """Yield SSE events: status (stage), explanation chunks, then result or error."""
+    cached = _get_cached_explanation(_explanation_cache_key(request, "stream", owner, repo, ref, instructions))
+    if cached is not None:
+        track_event(
+            request, owner, repo, "stream", "cache_hit",
+            explanation_chars=len(cached.explanation),
+            instructions_present=bool(instructions and instructions.strip()),
+        )
+        yield _sse_event("result", _sse_result_data(cached))
         return
 
     queue: asyncio.Queue = asyncio.Queue()
@@ -545,11 +686,11 @@ async def _stream_generator(
                 if item.get("error"):
                     yield _sse_event("error", {"detail": item["error"]})
                     break
+                if "chunk" in item:
+                    yield _sse_event("chunk", {"delta": item["chunk"]})
+                    continue
                 if item.get("done") and "result" in item:
-                    result = item["result"]
-                    data = result.model_dump()
-                    data["timestamp"] = result.timestamp.isoformat()
-                    yield _sse_event("result", data)
+                    yield _sse_event("result", _sse_result_data(item["result"]))
                     break
     finally:
         task.cancel()
@@ -608,8 +749,8 @@ async def chat_websocket(
         while True:
             raw = await websocket.receive_text()
             try:
-                data = json.loads(raw)
-            except json.JSONDecodeError:
+                data = utils.json_loads(raw)
+            except json.JSONDecodeError:  # orjson's decode error subclasses it
                 await websocket.send_json({"type": "error", "detail": "Invalid JSON"})
                 continue
 
@@ -675,7 +816,7 @@ async def chat_websocket(
                 continue
 
             repo_info = RepoInfo(owner=owner, repo_name=repo)
-            github_token = request_github_token or env.GITHUB_TOKEN or None
+            github_token = request_github_token or env.GITHUB_TOKEN
 
             async def status_callback(stage: str, detail: Optional[str]) -> None:
                 message = {"type": "status", "stage": stage}
@@ -696,21 +837,21 @@ async def chat_websocket(
                 await websocket.send_json({"type": "chunk", "delta": delta})
 
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    github = GitHubTools(client, github_token=github_token)
-                    tree = await github.fetch_directory_tree_with_depth(repo_info, depth=3)
-                    response_text = await chat_service.chat_with_repo(
-                        repo=repo_info,
-                        session_history=history,
-                        user_message=content,
-                        cached_explanation=explanation,
-                        directory_tree=tree,
-                        github=github,
-                        status_callback=status_callback,
-                        tool_call_callback=tool_call_callback,
-                        style=style,
-                        chunk_callback=chunk_callback,
-                    )
+                client = _get_http_client()
+                github = GitHubTools(client, github_token=github_token)
+                tree = await github.fetch_directory_tree_with_depth(repo_info, depth=3)
+                response_text = await chat_service.chat_with_repo(
+                    repo=repo_info,
+                    session_history=history,
+                    user_message=content,
+                    cached_explanation=explanation,
+                    directory_tree=tree,
+                    github=github,
+                    status_callback=status_callback,
+                    tool_call_callback=tool_call_callback,
+                    style=style,
+                    chunk_callback=chunk_callback,
+                )
 
                 await websocket.send_json({"type": "result", "message": response_text})
                 _track_chat_message(
@@ -18,7 +18,7 @@ from fastapi.responses import StreamingResponse
 app = FastAPI()
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
-STAGES = ["validating", "fetching_tree", "exploring_files", "fetching_files", "generating_explanation"]
+STAGES = ["fetching_tree", "exploring_files", "fetching_files", "generating_explanation"]
 STAGE_DELAY_S = 0.8
 
 FAKE_EXPLANATION = """# {repo}
@@ -78,7 +78,7 @@ async def stream(owner: str, repo: str, instructions: str | None = None):
     async def gen():
         # "error" as the repo name lets you exercise the error/back-to-home path.
         if repo == "error":
-            yield sse("status", {"stage": "validating"})
+            yield sse("status", {"stage": "fetching_tree"})
             await asyncio.sleep(STAGE_DELAY_S)
             yield sse("error", {"detail": f"Repository '{owner}/{repo}' not found (mock error)."})
             return
@@ -36,11 +36,25 @@ List the file paths to read (one per line, relative to repo root). No other text
 {tree}
 </tree>
 """
+_FILES_TO_EXPLORE_USER_HEAD, _FILES_TO_EXPLORE_USER_TAIL = FILES_TO_EXPLORE_USER_TEMPLATE.split("{tree}", 1)
 
 
+# A pure string template over a tree already cropped to 10k characters, so a small memo
+# avoids re-rendering identical inputs without keeping much resident.
+@lru_cache(maxsize=32)
 def build_files_to_explore_user(tree_str: str) -> str:
     """Build user prompt for the files-to-explore LLM call."""
-    return FILES_TO_EXPLORE_USER_TEMPLATE.format(tree=tree_str)
+    return "".join((_FILES_TO_EXPLORE_USER_HEAD, tree_str, _FILES_TO_EXPLORE_USER_TAIL))
+
+
+# One path per line: optional "- "/"* " bullet, then a single whitespace-free token.
+# Lines starting with "#" or "<" (headings, tags) are skipped.
+# The whole scan is one findall in the regex engine's C loop, so it stays pure Python;
+# if it ever shows up in profiles, a Cython bytes scanner is the next step (Numba can't
+# compile str/regex code).
+_PATH_LINE_RE = re.compile(r"^[^\S\n]*(?![#<])(?:[-*][^\S\n]+)?(\S+)[^\S\n]*$", re.MULTILINE)
+# Only needed when the opening fence line carries more than a language tag.
+_CODE_FENCE_OPEN_RE = re.compile(r"^```\w*\n?")
 
 
 def parse_paths_from_response(text: str) -> List[str]:
@@ -50,19 +64,17 @@ def parse_paths_from_response(text: str) -> List[str]:
     """
     if not text or not text.strip():
         return []
-    out = []
     raw = text.strip()
     if raw.startswith("```"):
-        raw = re.sub(r"^```\w*\n?", "", raw)
-        raw = re.sub(r"\n?```\s*$", "", raw)
-    for line in raw.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or line.startswith("<"):
-            continue
-        line = re.sub(r"^[\-\*]\s+", "", line).strip()
-        if line and " " not in line:
-            out.append(line)
-    return out
+        fence_line, _, body = raw.partition("\n")
+        tag = fence_line[3:]
+        if not tag or tag.replace("_", "").isalnum():  # bare fence or ```lang
+            raw = body
+        else:
+            raw = _CODE_FENCE_OPEN_RE.sub("", raw, count=1)
+        if raw.endswith("```"):  # raw was stripped, so no trailing whitespace follows
+            raw = raw[:-3].removesuffix("\n")
+    return _PATH_LINE_RE.findall(raw)
 
 SUGGEST_QUESTIONS_SYSTEM = """You suggest exactly 3 short, specific questions a developer could ask next about a codebase, based on the explanation and directory tree given. Prefer questions that point at specific files or directories from the tree over generic ones. Each question MUST be 10 words or fewer. Return ONLY the 3 questions, one per line. No numbering, no bullets, no extra text."""
 
@@ -85,13 +97,17 @@ def build_suggest_questions_user(explanation: str, tree: str = "") -> str:
     return SUGGEST_QUESTIONS_USER_TEMPLATE.format(explanation=explanation, tree_section=tree_section)
 
 
+# Leading numbering or bullets such as "1.", "2)", "- " or "* ".
+_QUESTION_PREFIX_RE = re.compile(r"^[\-\*\d\.\)]+\s*")
+
+
 def parse_questions_from_response(text: str) -> List[str]:
     """Parse LLM response into up to 3 question strings, stripping numbering/bullets."""
     if not text or not text.strip():
         return []
     out = []
     for line in text.strip().splitlines():
-        line = re.sub(r"^[\-\*\d\.\)]+\s*", "", line.strip()).strip()
+        line = _QUESTION_PREFIX_RE.sub("", line.strip(), count=1).strip()
         if line:
             out.append(line)
     return out[:3]
@@ -189,6 +205,19 @@ Repository context:
 {repo_context}
 """
 
+# The template split once around its placeholders, so building a prompt is one join
+# over constant pieces instead of re-parsing the template with str.format each call.
+_, _USER_PROMPT_REST = USER_PROMPT_TEMPLATE.split("{user_instructions_section}", 1)
+_USER_PROMPT_HEAD, _USER_PROMPT_REST = _USER_PROMPT_REST.split("{repo_name}", 1)
+_USER_PROMPT_MIDDLE, _USER_PROMPT_TAIL = _USER_PROMPT_REST.split("{repo_context}", 1)
+del _USER_PROMPT_REST
+
+_USER_REQUEST_PREFIX = (
+    "USER REQUEST (answer this by tailoring the content inside sections 1–4 only; "
+    'do NOT add a separate section or paragraph at the end for this):\n"'
+)
+_USER_REQUEST_SUFFIX = '"\n\n'
+
 
 def build_user_prompt(repo_name: str, repo_context: str, user_instructions: Optional[str] = None) -> str:
     """
@@ -202,19 +231,13 @@ def build_user_prompt(repo_name: str, repo_context: str, user_instructions: Opti
     Returns:
         The formatted prompt string
     """
-    if user_instructions and user_instructions.strip():
-        user_instructions_section = (
-            "USER REQUEST (answer this by tailoring the content inside sections 1–4 only; do NOT add a separate section or paragraph at the end for this):\n"
-            f'"{user_instructions.strip()}"\n\n'
-        )
-    else:
-        user_instructions_section = ""
-    
-    return USER_PROMPT_TEMPLATE.format(
-        repo_name=repo_name,
-        repo_context=repo_context,
-        user_instructions_section=user_instructions_section
-    )
+    instructions = user_instructions.strip() if user_instructions else ""
+    if not instructions:
+        return "".join((_USER_PROMPT_HEAD, repo_name, _USER_PROMPT_MIDDLE, repo_context, _USER_PROMPT_TAIL))
+    return "".join((
+        _USER_REQUEST_PREFIX, instructions, _USER_REQUEST_SUFFIX,
+        _USER_PROMPT_HEAD, repo_name, _USER_PROMPT_MIDDLE, repo_context, _USER_PROMPT_TAIL,
+    ))
 
 
 CHAT_SYSTEM_TEMPLATE = """You are a knowledgeable assistant helping a developer understand the {owner}/{repo} repository.
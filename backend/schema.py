@@ -1,19 +1,30 @@
 from datetime import datetime
 from typing import Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class RepoInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     owner: str
     repo_name: str
 
 class GitHubApiError(Exception):
     """Custom exception for GitHub API errors."""
+    # Slots keep BaseException's lazy __dict__ from being created, so __reduce__
+    # has to carry the fields explicitly for pickling.
+    __slots__ = ("status_code", "details")
+
     def __init__(self, message: str, status_code: Optional[int] = None, details: Optional[Any] = None):
         super().__init__(message)
         self.status_code = status_code
         self.details = details
 
+    def __reduce__(self):
+        return type(self), (*self.args, self.status_code, self.details)
+
 class ModelResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     explanation: str
     repo: str
     timestamp: datetime
@@ -6,3 +6,6 @@ import os
 # Use in-memory SQLite when DATABASE_URL is not set (e.g. CI, fresh clone).
 # Lets tests that import backend.main/backend.database run without a real DB.
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+# Don't open real provider connections whenever a test enters the app lifespan.
+os.environ.setdefault("AI_PROVIDER_WARMUP", "false")
@@ -1,8 +1,13 @@
-"""Tests for ai_service.suggest_questions."""
+"""Tests for ai_service.suggest_questions and the LLM response cache."""
 
 import asyncio
 
+import pytest
+
 from backend import ai_service
+from backend.ai.cache import LLMCache
+from backend.ai.providers.claude import ClaudeProvider
+from backend.schema import RepoInfo
 
 
 class _FakeProvider:
@@ -15,6 +20,13 @@ class _FakeProvider:
         return self._response
 
 
+@pytest.fixture(autouse=True)
+def _clear_llm_cache():
+    ai_service._llm_cache.clear()
+    yield
+    ai_service._llm_cache.clear()
+
+
 def test_suggest_questions_uses_low_thinking_effort(monkeypatch):
     """Regression guard: 'high' thinking burns the token budget on reasoning before any
     question text, which is what caused suggestions to silently fall back to defaults."""
@@ -39,3 +51,262 @@ def test_suggest_questions_returns_three_when_complete(monkeypatch):
     )
     result = asyncio.run(ai_service.suggest_questions("some explanation"))
     assert result == ["How does routing work?", "Where is auth handled?", "Explain the test setup"]
+
+
+def test_get_files_to_explore_serves_repeat_tree_from_cache(monkeypatch):
+    """The same tree twice should cost one provider call, not two."""
+    provider = _FakeProvider("README.md\nsrc/main.py")
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+
+    first = asyncio.run(ai_service.get_files_to_explore("tree", repo_prefix="octocat/Hello-World"))
+    second = asyncio.run(ai_service.get_files_to_explore("tree", repo_prefix="octocat/Hello-World"))
+
+    assert first == second == ["README.md", "src/main.py"]
+    assert len(provider.calls) == 1
+    assert ai_service.llm_cache_stats()["hits"] == 1
+
+
+def test_concurrent_identical_calls_share_one_provider_request(monkeypatch):
+    """Simultaneous requests for the same explanation must not each hit the provider."""
+    calls = {"count": 0}
+
+    class _SlowProvider:
+        async def call_llm(self, system, user_content, max_tokens=4096, thinking_level="high"):
+            calls["count"] += 1
+            await asyncio.sleep(0.01)
+            return "explanation"
+
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: _SlowProvider())
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    async def run():
+        return await asyncio.gather(*(ai_service.explain_repo(repo, "context") for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert results == [("explanation", True)] * 3
+    assert calls["count"] == 1
+    assert ai_service._inflight == {}
+
+
+def test_explain_repos_bulk_batches_claude_calls_and_warms_cache(monkeypatch):
+    """Bulk backfill goes through one batch; its results serve later explain_repo calls."""
+    submitted: list[list] = []
+
+    async def fake_batch_call_llm(provider, requests):
+        submitted.append(requests)
+        return ["explained one", None]
+
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: ClaudeProvider(api_key="test-key"))
+    monkeypatch.setattr(ai_service, "batch_call_llm", fake_batch_call_llm)
+    repos = [RepoInfo(owner="octocat", repo_name="one"), RepoInfo(owner="octocat", repo_name="two")]
+
+    results = asyncio.run(ai_service.explain_repos_bulk(repos, ["ctx one", "ctx two"]))
+
+    assert len(submitted) == 1 and len(submitted[0]) == 2
+    assert results[0] == ("explained one", True)
+    assert results[1][1] is False
+    assert asyncio.run(ai_service.explain_repo(repos[0], "ctx one")) == ("explained one", True)
+
+
+def test_explain_repo_streams_chunks_and_caches_full_text(monkeypatch):
+    """Streaming explain forwards deltas as they arrive and replays the cached text on repeat."""
+    class _StreamingProvider:
+        def __init__(self):
+            self.stream_calls = 0
+
+        async def stream_llm(self, system, messages, on_chunk, max_tokens=4096):
+            self.stream_calls += 1
+            for part in ("Hello ", "world"):
+                await on_chunk(part)
+            return "Hello world"
+
+    provider = _StreamingProvider()
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    async def run():
+        chunks: list[str] = []
+
+        async def on_chunk(delta):
+            chunks.append(delta)
+
+        result = await ai_service.explain_repo(repo, "context", chunk_callback=on_chunk)
+        return result, chunks
+
+    first, first_chunks = asyncio.run(run())
+    second, second_chunks = asyncio.run(run())
+
+    assert first == second == ("Hello world", True)
+    assert first_chunks == ["Hello ", "world"]
+    assert second_chunks == ["Hello world"]
+    assert provider.stream_calls == 1
+
+
+class _FlakyStreamingProvider:
+    """Streams `parts`, raising a retryable 503 after `fail_after` chunks on the first call."""
+
+    def __init__(self, parts, fail_after):
+        self.parts = parts
+        self.fail_after = fail_after
+        self.stream_calls = 0
+
+    async def stream_llm(self, system, messages, on_chunk, max_tokens=4096):
+        self.stream_calls += 1
+        for index, part in enumerate(self.parts):
+            if self.stream_calls == 1 and index == self.fail_after:
+                raise RuntimeError("503 UNAVAILABLE")
+            await on_chunk(part)
+        return "".join(self.parts)
+
+
+def _stream_explain(repo):
+    async def run():
+        chunks: list[str] = []
+
+        async def on_chunk(delta):
+            chunks.append(delta)
+
+        result = await ai_service.explain_repo(repo, "context", chunk_callback=on_chunk)
+        return result, chunks
+
+    return asyncio.run(run())
+
+
+async def _no_sleep(delay):
+    return None
+
+
+def test_streaming_explain_retries_failures_before_the_first_chunk(monkeypatch):
+    provider = _FlakyStreamingProvider(["Hello ", "world"], fail_after=0)
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+    monkeypatch.setattr("backend.ai.retry.asyncio.sleep", _no_sleep)
+
+    result, chunks = _stream_explain(RepoInfo(owner="octocat", repo_name="Hello-World"))
+
+    assert result == ("Hello world", True)
+    assert chunks == ["Hello ", "world"]
+    assert provider.stream_calls == 2
+
+
+def test_streaming_explain_does_not_restart_after_forwarding_text(monkeypatch):
+    """A retry after text reached the client would send it twice, so the error surfaces instead."""
+    provider = _FlakyStreamingProvider(["Hello ", "world"], fail_after=1)
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+    monkeypatch.setattr("backend.ai.retry.asyncio.sleep", _no_sleep)
+
+    (text, success), chunks = _stream_explain(RepoInfo(owner="octocat", repo_name="Hello-World"))
+
+    assert success is False and "503" in text
+    assert chunks == ["Hello "]
+    assert provider.stream_calls == 1
+    assert ai_service._llm_cache.snapshot()["size"] == 0
+
+
+def test_concurrent_identical_streams_share_one_generation(monkeypatch):
+    class _SlowStreamingProvider:
+        def __init__(self):
+            self.stream_calls = 0
+
+        async def stream_llm(self, system, messages, on_chunk, max_tokens=4096):
+            self.stream_calls += 1
+            await on_chunk("Hello ")
+            await asyncio.sleep(0.01)
+            await on_chunk("world")
+            return "Hello world"
+
+    provider = _SlowStreamingProvider()
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    async def run():
+        first_chunks: list[str] = []
+        second_chunks: list[str] = []
+
+        async def on_first(delta):
+            first_chunks.append(delta)
+
+        async def on_second(delta):
+            second_chunks.append(delta)
+
+        results = await asyncio.gather(
+            ai_service.explain_repo(repo, "context", chunk_callback=on_first),
+            ai_service.explain_repo(repo, "context", chunk_callback=on_second),
+        )
+        return results, first_chunks, second_chunks
+
+    results, first_chunks, second_chunks = asyncio.run(run())
+
+    assert results == [("Hello world", True), ("Hello world", True)]
+    assert first_chunks == ["Hello ", "world"]
+    assert second_chunks == ["Hello world"]
+    assert provider.stream_calls == 1
+
+
+def test_llm_cache_evicts_least_recently_used_and_expires(monkeypatch):
+    cache = LLMCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+    monkeypatch.setattr("backend.ai.cache.time.monotonic", lambda: float("inf"))
+    assert cache.get("a") is None
+
+
+class _DictCacheBackend:
+    """In-memory stand-in for a shared (Redis) cache backend."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def aclose(self):
+        pass
+
+
+def test_shared_cache_serves_other_workers_and_receives_new_results(monkeypatch):
+    shared = _DictCacheBackend()
+    provider = _FakeProvider("README.md")
+    monkeypatch.setattr(ai_service, "_get_shared_cache", lambda: shared)
+    monkeypatch.setattr(ai_service, "_get_provider", lambda: provider)
+
+    assert asyncio.run(ai_service.get_files_to_explore("tree")) == ["README.md"]
+    assert len(provider.calls) == 1 and len(shared.data) == 1
+
+    # A sibling worker has an empty in-process cache but finds the shared entry.
+    ai_service._llm_cache.clear()
+    assert asyncio.run(ai_service.get_files_to_explore("tree")) == ["README.md"]
+    assert len(provider.calls) == 1
+
+
+def test_llm_cache_key_is_identical_with_and_without_orjson(monkeypatch):
+    args = ("claude-haiku", "système", "tree ├── README.md", 1024)
+    with_orjson = LLMCache.make_key(*args)
+    monkeypatch.setattr("backend.utils.orjson", None)
+    assert LLMCache.make_key(*args) == with_orjson
+
+
+@pytest.mark.parametrize(
+    ("path", "prefix", "expected"),
+    [
+        ("fastapi/fastapi/README.md", "fastapi/fastapi", "README.md"),
+        ("fastapi/fastapi/utils.py", "", "fastapi/utils.py"),
+        ("src/src/src/main.py", "", "src/main.py"),
+        ("a/ab/c.py", "", "a/ab/c.py"),
+        ("//docs//index.md", "", "docs/index.md"),
+    ],
+)
+def test_normalize_llm_path(path, prefix, expected):
+    assert ai_service._normalize_llm_path(path, prefix) == expected
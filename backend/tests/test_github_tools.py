@@ -1,13 +1,29 @@
 """Tests for GitHubTools repo-context fetching resilience."""
 
 import asyncio
+import json
+import pickle
 from unittest.mock import MagicMock
 
+import httpx
+import pytest
+
 from backend import github_tools
 from backend.github_tools import GitHubTools
 from backend.schema import GitHubApiError, RepoInfo
 
 
+@pytest.fixture(autouse=True)
+def _clear_github_caches():
+    github_tools._tree_cache.clear()
+    github_tools._etag_cache.clear()
+    github_tools._not_found_cache.clear()
+    yield
+    github_tools._tree_cache.clear()
+    github_tools._etag_cache.clear()
+    github_tools._not_found_cache.clear()
+
+
 def test_get_repo_context_survives_partial_fetch_failures(monkeypatch):
     """One failed file fetch (403/timeout) must skip that file, not abort the whole context."""
     github = GitHubTools(MagicMock(), github_token=None)
@@ -22,7 +38,7 @@ def test_get_repo_context_survives_partial_fetch_failures(monkeypatch):
     async def fake_explore(tree, repo_prefix=""):
         return ["good.py", "bad.py"]
 
-    async def fake_fetch(repo_arg, path):
+    async def fake_fetch(repo_arg, path, max_bytes=None):
         if path == "bad.py":
             raise GitHubApiError("GitHub API error: 403")
         return f"content of {path}", True
@@ -38,7 +54,7 @@ def test_get_repo_context_survives_partial_fetch_failures(monkeypatch):
     assert "content of good.py" in content
     assert "content of README.md" in content
     assert "content of bad.py" not in content
-    assert files_read == 3  # attempted: README.md + good.py + bad.py
+    assert files_read == 2  # written to the context: README.md + good.py
     assert files_failed == 1  # bad.py raised; visible in analytics as files_failed_count
 
 
@@ -56,7 +72,7 @@ def test_get_repo_context_all_fetches_fail_still_returns_tree(monkeypatch):
     async def fake_explore(tree, repo_prefix=""):
         return []
 
-    async def fake_fetch(repo_arg, path):
+    async def fake_fetch(repo_arg, path, max_bytes=None):
         raise GitHubApiError("GitHub API error: 403")
 
     monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
@@ -86,7 +102,7 @@ def test_get_repo_context_handles_empty_root_directory(monkeypatch):
     async def fake_explore(tree, repo_prefix=""):
         return ["nested/pom.xml"]
 
-    async def fake_fetch(repo_arg, path):
+    async def fake_fetch(repo_arg, path, max_bytes=None):
         return f"content of {path}", True
 
     monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
@@ -98,3 +114,644 @@ def test_get_repo_context_handles_empty_root_directory(monkeypatch):
 
     assert success is True
     assert "content of nested/pom.xml" in content
+
+
+def test_get_repo_context_reads_root_files_from_tree_without_listing(monkeypatch):
+    """Root files come from the recursive tree response; no extra /contents listing call."""
+    tree_response = MagicMock(status_code=200)
+    tree_response.content = json.dumps({
+        "truncated": False,
+        "tree": [
+            {"path": "README.md", "type": "blob"},
+            {"path": "src", "type": "tree"},
+            {"path": "src/package.json", "type": "blob"},
+        ],
+    }).encode()
+
+    async def fake_get(url, headers=None):
+        return tree_response
+
+    client = MagicMock()
+    client.get = fake_get
+    github = GitHubTools(client, github_token=None, ref="main")
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+    fetched = []
+
+    async def fail_list(repo_arg, path=""):
+        raise AssertionError("root listing should come from the tree")
+
+    async def fake_explore(tree, repo_prefix=""):
+        return []
+
+    async def fake_fetch(repo_arg, path, max_bytes=None):
+        fetched.append(path)
+        return f"content of {path}", True
+
+    monkeypatch.setattr(github, "list_directory_files", fail_list)
+    monkeypatch.setattr(github, "get_file_contents", fake_fetch)
+    monkeypatch.setattr(github_tools.ai_service, "get_files_to_explore", fake_explore)
+
+    content, success, *_ = asyncio.run(github.get_repo_context(repo))
+
+    assert success is True
+    assert fetched == ["README.md"]  # src/package.json is not at the root
+
+
+def test_fetch_tree_overlaps_default_branch_lookup_with_head_tree():
+    """Without a ref, the HEAD tree is requested alongside the default-branch lookup."""
+    requested = []
+
+    async def fake_get(url, headers=None):
+        requested.append(url)
+        response = MagicMock(status_code=200)
+        if url.endswith("/octocat/Hello-World"):
+            response.content = json.dumps({"default_branch": "trunk"}).encode()
+        else:
+            response.content = json.dumps({"truncated": False, "tree": [{"path": "README.md", "type": "blob"}]}).encode()
+        return response
+
+    client = MagicMock()
+    client.get = fake_get
+    github = GitHubTools(client, github_token=None)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    tree = asyncio.run(github.fetch_directory_tree_with_depth(repo, depth=3))
+
+    assert "README.md" in tree
+    assert len(requested) == 2
+    assert requested[1].endswith("/git/trees/HEAD?recursive=1")
+    assert github._resolved_default_branch == "trunk"
+
+
+def test_truncated_tree_is_filled_in_from_top_level_listings(monkeypatch):
+    """A truncated recursive tree is patched with one /contents listing per root directory."""
+    listed = []
+
+    async def fake_get(url, headers=None):
+        response = MagicMock(status_code=200)
+        response.content = json.dumps({
+            "truncated": True,
+            "tree": [
+                {"path": "README.md", "type": "blob"},
+                {"path": "src", "type": "tree"},
+                {"path": "docs", "type": "tree"},
+                {"path": "src/a.py", "type": "blob"},
+            ],
+        }).encode()
+        return response
+
+    async def fake_list(repo_arg, path=""):
+        listed.append(path)
+        if path == "docs":
+            raise GitHubApiError(message="boom")
+        return ["src/a.py", "src/b.py"], True
+
+    client = MagicMock()
+    client.get = fake_get
+    github = GitHubTools(client, github_token=None, ref="main")
+    monkeypatch.setattr(github, "list_directory_files", fake_list)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    tree = asyncio.run(github.fetch_directory_tree_with_depth(repo, depth=3))
+
+    assert sorted(listed) == ["docs", "src"]
+    assert "b.py" in tree
+    assert tree.count("a.py") == 1
+    assert github._tree_index is None
+
+
+def test_truncated_tree_fill_lists_at_most_max_files_to_fetch_directories(monkeypatch):
+    listed = []
+
+    async def fake_get(url, headers=None):
+        response = MagicMock(status_code=200)
+        response.content = json.dumps({
+            "truncated": True,
+            "tree": [{"path": f"dir{i:02d}", "type": "tree"} for i in range(5)],
+        }).encode()
+        return response
+
+    async def fake_list(repo_arg, path=""):
+        listed.append(path)
+        return [], True
+
+    client = MagicMock()
+    client.get = fake_get
+    github = GitHubTools(client, github_token=None, ref="main")
+    monkeypatch.setattr(GitHubTools, "MAX_FILES_TO_FETCH", 3)
+    monkeypatch.setattr(github, "list_directory_files", fake_list)
+
+    asyncio.run(github.fetch_directory_tree_with_depth(RepoInfo(owner="o", repo_name="r"), depth=3))
+
+    assert sorted(listed) == ["dir00", "dir01", "dir02"]
+
+
+def test_get_repo_context_fetches_important_files_while_llm_decides(monkeypatch):
+    """IMPORTANT_FILES at the root are fetched concurrently with the LLM path suggestion."""
+    github = GitHubTools(MagicMock(), github_token=None)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+    fetched = []
+
+    async def fake_tree(repo, depth):
+        return "Directory structure:\n└── octocat/Hello-World/\n    └── README.md"
+
+    async def fake_list(repo_arg, path=""):
+        return ["README.md"], True
+
+    async def fake_explore(tree, repo_prefix=""):
+        await asyncio.sleep(0)
+        assert fetched == ["README.md"]  # already in flight before the suggestion returns
+        return ["src/main.py"]
+
+    async def fake_fetch(repo_arg, path, max_bytes=None):
+        fetched.append(path)
+        return f"content of {path}", True
+
+    monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
+    monkeypatch.setattr(github, "list_directory_files", fake_list)
+    monkeypatch.setattr(github, "get_file_contents", fake_fetch)
+    monkeypatch.setattr(github_tools.ai_service, "get_files_to_explore", fake_explore)
+
+    content, success, _tree_count, files_read, _files_failed = asyncio.run(github.get_repo_context(repo))
+
+    assert success is True
+    assert fetched == ["README.md", "src/main.py"]
+    assert files_read == 2
+
+
+def test_get_repo_context_requests_readme_alongside_tree(monkeypatch):
+    """README.md is fetched while the tree is in flight and reused once the root confirms it."""
+    github = GitHubTools(MagicMock(), github_token=None)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+    fetched = []
+
+    async def fake_tree(repo, depth):
+        await asyncio.sleep(0)
+        assert fetched == ["README.md"]  # already in flight before the tree returns
+        return "Directory structure:\n└── octocat/Hello-World/\n    └── README.md"
+
+    async def fake_list(repo_arg, path=""):
+        return ["README.md"], True
+
+    async def fake_explore(tree, repo_prefix=""):
+        return []
+
+    async def fake_fetch(repo_arg, path, max_bytes=None):
+        fetched.append(path)
+        return f"content of {path}", True
+
+    monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
+    monkeypatch.setattr(github, "list_directory_files", fake_list)
+    monkeypatch.setattr(github, "get_file_contents", fake_fetch)
+    monkeypatch.setattr(github_tools.ai_service, "get_files_to_explore", fake_explore)
+
+    content, success, _tree_count, files_read, _files_failed = asyncio.run(github.get_repo_context(repo))
+
+    assert success is True
+    assert fetched == ["README.md"]  # not requested a second time
+    assert "content of README.md" in content
+    assert files_read == 1
+
+
+def test_get_repo_context_cancels_queued_fetches_once_budget_is_spent(monkeypatch):
+    """Files queued behind the request semaphore are never fetched after the context fills up."""
+    github = GitHubTools(MagicMock(), github_token=None)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+    tree = "Directory structure:\n└── octocat/Hello-World/"
+    monkeypatch.setattr(GitHubTools, "MAX_TOTAL_CHARS", len(tree) + 15)  # room for one file
+    paths = [f"src/f{i}.py" for i in range(8)]
+    gate = asyncio.Semaphore(1)  # stands in for _request_semaphore
+    fetched = []
+
+    async def fake_tree(repo, depth):
+        return tree
+
+    async def fake_list(repo_arg, path=""):
+        return [], True
+
+    async def fake_explore(tree, repo_prefix=""):
+        return paths
+
+    async def fake_fetch(repo_arg, path, max_bytes=None):
+        async with gate:
+            fetched.append(path)
+            await asyncio.sleep(0)
+            return "x" * 10, True
+
+    monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
+    monkeypatch.setattr(github, "list_directory_files", fake_list)
+    monkeypatch.setattr(github, "get_file_contents", fake_fetch)
+    monkeypatch.setattr(github_tools.ai_service, "get_files_to_explore", fake_explore)
+
+    content, success, _tree_count, files_read, _files_failed = asyncio.run(github.get_repo_context(repo))
+
+    assert success is True
+    assert "FILE: src/f0.py" in content
+    assert "FILE: src/f1.py" not in content
+    assert "Remaining files skipped" in content
+    assert files_read == 1
+    assert paths[-1] not in fetched
+    assert len(fetched) < len(paths)
+
+
+def test_github_get_waits_out_rate_limit_then_succeeds(monkeypatch):
+    """A 429 with Retry-After is retried after the advertised delay instead of dropping the file."""
+    responses = [
+        MagicMock(status_code=429, headers={"Retry-After": "2"}),
+        MagicMock(status_code=200, headers={}, text="hello"),
+    ]
+    sleeps = []
+
+    async def fake_get(url, **kwargs):
+        return responses.pop(0)
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    client = MagicMock()
+    client.get = fake_get
+    monkeypatch.setattr(github_tools.asyncio, "sleep", fake_sleep)
+    github = GitHubTools(client, github_token=None, ref="main")
+
+    content, success = asyncio.run(github.get_file_contents(RepoInfo(owner="o", repo_name="r"), "README.md"))
+
+    assert (content, success) == ("hello", True)
+    assert len(sleeps) == 1
+    assert 2.0 <= sleeps[0] <= 2.0 + GitHubTools.RATE_LIMIT_JITTER_S
+
+
+def test_github_get_retries_gateway_errors_and_dropped_connections(monkeypatch):
+    """A 502 and a dropped connection are retried with a short backoff instead of failing the file."""
+    outcomes = [
+        MagicMock(status_code=502, headers={}),
+        httpx.RemoteProtocolError("Server disconnected without sending a response."),
+        MagicMock(status_code=200, headers={}, text="hello"),
+    ]
+    sleeps = []
+
+    async def fake_get(url, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    client = MagicMock()
+    client.get = fake_get
+    monkeypatch.setattr(github_tools.asyncio, "sleep", fake_sleep)
+    github = GitHubTools(client, github_token=None, ref="main")
+
+    content, success = asyncio.run(github.get_file_contents(RepoInfo(owner="o", repo_name="r"), "README.md"))
+
+    assert (content, success) == ("hello", True)
+    assert len(sleeps) == 2
+    assert all(delay < 1.0 for delay in sleeps)
+
+
+def test_concurrent_identical_gets_share_one_request():
+    """Simultaneous crawls send each GET once; one caller cancelling doesn't abort it for the rest."""
+    calls = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def fake_get(url, **kwargs):
+            calls.append(url)
+            await gate.wait()
+            return MagicMock(status_code=200, headers={}, text="hello")
+
+        client = MagicMock()
+        client.get = fake_get
+        repo = RepoInfo(owner="o", repo_name="r")
+        first = asyncio.create_task(GitHubTools(client, ref="main").get_file_contents(repo, "README.md"))
+        second = asyncio.create_task(GitHubTools(client, ref="main").get_file_contents(repo, "README.md"))
+        quitter = asyncio.create_task(GitHubTools(client, ref="main").get_file_contents(repo, "README.md"))
+        await asyncio.sleep(0.01)
+        quitter.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        return await first, await second
+
+    assert asyncio.run(run()) == (("hello", True), ("hello", True))
+    assert calls == ["https://raw.githubusercontent.com/o/r/main/README.md"]
+    assert github_tools._get_inflight == {}
+
+
+
+def test_get_after_last_waiter_cancels_starts_a_fresh_request():
+    """A caller arriving while the abandoned GET is being cancelled must not inherit its CancelledError."""
+    calls = []
+
+    async def run():
+        async def fake_get(url, **kwargs):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return MagicMock(status_code=200, headers={}, text="hello")
+
+        client = MagicMock()
+        client.get = fake_get
+        repo = RepoInfo(owner="o", repo_name="r")
+        quitter = asyncio.create_task(GitHubTools(client, ref="main").get_file_contents(repo, "README.md"))
+        await asyncio.sleep(0)
+        quitter.cancel()
+        await asyncio.sleep(0)  # quitter's cleanup cancels the shared GET; its done-callback hasn't run yet
+        return await GitHubTools(client, ref="main").get_file_contents(repo, "README.md")
+
+    assert asyncio.run(run()) == ("hello", True)
+    assert len(calls) == 2
+    assert github_tools._get_inflight == {}
+
+def test_github_requests_are_capped_across_instances(monkeypatch):
+    """The process-wide cap holds even when each request's GitHubTools has spare slots."""
+    monkeypatch.setattr(github_tools.env, "GITHUB_MAX_CONCURRENT_REQUESTS", 2)
+    active = {"now": 0, "peak": 0}
+
+    async def fake_get(url, **kwargs):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.001)
+        active["now"] -= 1
+        return MagicMock(status_code=200, headers={}, text="ok")
+
+    client = MagicMock()
+    client.get = fake_get
+    repo = RepoInfo(owner="o", repo_name="r")
+
+    async def run():
+        return await asyncio.gather(*(
+            GitHubTools(client, ref="main").get_file_contents(repo, f"f{i}.py") for i in range(6)
+        ))
+
+    assert asyncio.run(run()) == [("ok", True)] * 6
+    assert active["peak"] == 2
+
+
+def test_missing_file_is_remembered_briefly():
+    """A 404 is served from the negative cache on the next ask instead of hitting GitHub again."""
+    requested = []
+
+    async def fake_get(url, **kwargs):
+        requested.append(url)
+        return httpx.Response(404, content=b'{"message": "Not Found"}', request=httpx.Request("GET", url))
+
+    client = MagicMock()
+    client.get = fake_get
+    github = GitHubTools(client, ref="main")
+    repo = RepoInfo(owner="o", repo_name="r")
+
+    first = asyncio.run(github.get_file_contents(repo, "NOPE.md"))
+    second = asyncio.run(github.get_file_contents(repo, "NOPE.md"))
+
+    assert first == second == (None, False)
+    assert len(requested) == 2  # raw host, then /contents, only the first time
+
+
+def test_get_repo_context_skips_suggestions_missing_from_tree(monkeypatch):
+    """LLM-suggested paths absent from a complete tree are never requested."""
+    github = GitHubTools(MagicMock(), github_token=None)
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+    fetched = []
+
+    async def fake_tree(repo, depth):
+        github._tree_index = github_tools._TreeIndex(
+            paths=frozenset({"README.md", "src", "src/main.py"}),
+            root_files=frozenset({"README.md"}),
+        )
+        return "Directory structure:\n└── octocat/Hello-World/"
+
+    async def fake_explore(tree, repo_prefix=""):
+        return ["src/main.py", "src/imagined.py"]
+
+    async def fake_fetch(repo_arg, path, max_bytes=None):
+        fetched.append(path)
+        return f"content of {path}", True
+
+    monkeypatch.setattr(github, "fetch_directory_tree_with_depth", fake_tree)
+    monkeypatch.setattr(github, "get_file_contents", fake_fetch)
+    monkeypatch.setattr(github_tools.ai_service, "get_files_to_explore", fake_explore)
+
+    _content, success, _tree_count, files_read, _files_failed = asyncio.run(github.get_repo_context(repo))
+
+    assert success is True
+    assert fetched == ["README.md", "src/main.py"]
+    assert files_read == 2
+
+
+def test_rate_limit_delay_ignores_plain_forbidden_and_long_resets():
+    github = GitHubTools(MagicMock(), github_token=None)
+    assert github._rate_limit_delay(MagicMock(status_code=403, headers={}), 0) is None
+    far_reset = MagicMock(
+        status_code=403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"}
+    )
+    assert github._rate_limit_delay(far_reset, 0) is None
+
+
+def test_important_root_files_match_case_and_extension_variants():
+    files = {"readme.MD", "LICENSE.txt", "LICENSE", "Makefile", "Dockerfile.dev", "main.py", "Contributing.rst"}
+    assert GitHubTools._important_root_files(files) == ["readme.MD", "Makefile", "LICENSE", "Contributing.rst"]
+
+
+def test_format_github_tree_structure_orders_levels_and_limits_depth():
+    flat = [
+        {"path": "src/app/main.py", "type": "blob"},  # parent dirs omitted from the listing
+        {"path": "README.md", "type": "blob"},
+        {"path": "src/utils.py", "type": "blob"},
+        {"path": "src-extra", "type": "tree"},
+    ]
+
+    assert GitHubTools._format_github_tree_structure(flat, "o/r") == "\n".join([
+        "Directory structure:",
+        "└── o/r/",
+        "    ├── README.md",
+        "    ├── src/",
+        "    │   ├── app/",
+        "    │   │   └── main.py",
+        "    │   └── utils.py",
+        "    └── src-extra/",
+    ])
+    assert GitHubTools._format_github_tree_structure(flat, "o/r", max_depth=2).splitlines()[2:] == [
+        "    ├── README.md",
+        "    ├── src/",
+        "    └── src-extra/",
+    ]
+
+
+def test_get_file_contents_stops_downloading_at_max_bytes():
+    """A huge file is cut off at max_bytes on the wire instead of downloaded in full."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 1_000_000))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            github = GitHubTools(client, github_token=None, ref="main")
+            return await github.get_file_contents(RepoInfo(owner="o", repo_name="r"), "package-lock.json", max_bytes=100)
+
+    content, success = asyncio.run(run())
+
+    assert success is True
+    assert content == "x" * 100
+
+
+def test_fetch_tree_is_cached_and_shared_across_instances():
+    """Concurrent and repeat calls for the same repo/ref/depth cost one GitHub fetch."""
+    calls = {"count": 0}
+
+    async def fake_get(url, headers=None):
+        calls["count"] += 1
+        await asyncio.sleep(0)
+        response = MagicMock(status_code=200)
+        response.content = json.dumps({"truncated": False, "tree": [{"path": "README.md", "type": "blob"}]}).encode()
+        return response
+
+    def make_github(token=None):
+        client = MagicMock()
+        client.get = fake_get
+        return GitHubTools(client, github_token=token, ref="main")
+
+    repo = RepoInfo(owner="octocat", repo_name="Hello-World")
+
+    async def run():
+        first, second = await asyncio.gather(
+            make_github().fetch_directory_tree_with_depth(repo, depth=3),
+            make_github().fetch_directory_tree_with_depth(repo, depth=3),
+        )
+        third = await make_github().fetch_directory_tree_with_depth(repo, depth=3)
+        await make_github(token="secret").fetch_directory_tree_with_depth(repo, depth=3)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert first == second == third
+    assert calls["count"] == 2  # one shared fetch, plus one for the different token
+
+
+def test_tree_cache_keeps_only_an_index_and_purges_expired_entries_on_insert():
+    async def fake_get(url, headers=None):
+        response = MagicMock(status_code=200)
+        response.content = json.dumps({
+            "truncated": False,
+            "tree": [
+                {"path": "README.md", "type": "blob", "sha": "a" * 40},
+                {"path": "src", "type": "tree", "sha": "b" * 40},
+                {"path": "src/main.py", "type": "blob", "sha": "c" * 40},
+            ],
+        }).encode()
+        return response
+
+    client = MagicMock()
+    client.get = fake_get
+    github_tools._tree_cache[("stale",)] = (0.0, ("old tree", None, None))
+
+    asyncio.run(
+        GitHubTools(client, github_token=None, ref="main").fetch_directory_tree_with_depth(
+            RepoInfo(owner="octocat", repo_name="Hello-World"), depth=3
+        )
+    )
+
+    assert ("stale",) not in github_tools._tree_cache
+    [(_expires_at, (_tree, index, _branch))] = github_tools._tree_cache.values()
+    assert index.paths == {"README.md", "src", "src/main.py"}
+    assert index.root_files == {"README.md"}
+
+
+def test_repeat_file_fetch_uses_etag_and_serves_304_from_cache():
+    seen_if_none_match = []
+
+    def handler(request):
+        seen_if_none_match.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, headers={"ETag": '"v1"'}, content=b"hello")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            repo = RepoInfo(owner="o", repo_name="r")
+            first = await GitHubTools(client, github_token=None, ref="main").get_file_contents(repo, "README.md")
+            second = await GitHubTools(client, github_token=None, ref="main").get_file_contents(repo, "README.md")
+            return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == ("hello", True)
+    assert seen_if_none_match == [None, '"v1"']
+
+
+def test_etag_cache_evicts_oldest_bodies_past_the_total_byte_budget(monkeypatch):
+    monkeypatch.setattr(GitHubTools, "ETAG_CACHE_MAX_TOTAL_BYTES", 10)
+
+    def handler(request):
+        return httpx.Response(200, headers={"ETag": '"v1"'}, content=b"abcdef")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            github = GitHubTools(client, github_token=None, ref="main")
+            repo = RepoInfo(owner="o", repo_name="r")
+            for path in ("a.md", "b.md", "c.md"):
+                await github.get_file_contents(repo, path)
+
+    asyncio.run(run())
+
+    assert len(github_tools._etag_cache) == 1
+    assert sum(len(body) for _, _, body in github_tools._etag_cache.values()) <= 10
+    assert "c.md" in str(next(iter(github_tools._etag_cache)))
+
+
+def test_get_file_contents_prefers_raw_host_and_falls_back_to_api():
+    requested_hosts = []
+
+    def handler(request):
+        requested_hosts.append(request.url.host)
+        if request.url.path.endswith("/docs"):  # a directory: raw host has nothing to serve
+            if request.url.host == "raw.githubusercontent.com":
+                return httpx.Response(404)
+            return httpx.Response(200, content=b"[]")
+        return httpx.Response(200, content=b"file body")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            github = GitHubTools(client, github_token=None, ref="main")
+            repo = RepoInfo(owner="o", repo_name="r")
+            return await github.get_file_contents(repo, "README.md"), await github.get_file_contents(repo, "docs")
+
+    readme, docs = asyncio.run(run())
+
+    assert readme == ("file body", True)
+    assert docs == ("[]", True)
+    assert requested_hosts == ["raw.githubusercontent.com", "raw.githubusercontent.com", "api.github.com"]
+
+
+def test_large_tree_is_parsed_and_formatted_off_the_event_loop(monkeypatch):
+    offloaded = []
+    real_to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args, **kwargs):
+        offloaded.append(func.__name__)
+        return await real_to_thread(func, *args, **kwargs)
+
+    async def fake_get(url, headers=None):
+        response = MagicMock(status_code=200)
+        response.content = json.dumps({"truncated": False, "tree": [{"path": "README.md", "type": "blob"}]}).encode()
+        return response
+
+    client = MagicMock()
+    client.get = fake_get
+    monkeypatch.setattr(GitHubTools, "TREE_OFFLOAD_BYTES", 0)
+    monkeypatch.setattr(github_tools.asyncio, "to_thread", recording_to_thread)
+    github = GitHubTools(client, github_token=None, ref="main")
+
+    tree = asyncio.run(github.fetch_directory_tree_with_depth(RepoInfo(owner="o", repo_name="r"), depth=3))
+
+    assert "README.md" in tree
+    assert offloaded == ["json_loads", "_format_github_tree_structure"]
+
+
+def test_github_api_error_round_trips_through_pickle():
+    """Slotted fields survive pickling (e.g. errors crossing a process pool)."""
+    error = GitHubApiError("GitHub API error: 404", status_code=404, details={"message": "Not Found"})
+    restored = pickle.loads(pickle.dumps(error))
+    assert not hasattr(error, "__dict__") or not error.__dict__
+    assert (str(restored), restored.status_code, restored.details) == (
+        "GitHub API error: 404", 404, {"message": "Not Found"},
+    )
+    assert repr(restored) == "GitHubApiError('GitHub API error: 404')"
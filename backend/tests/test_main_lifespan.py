@@ -1,12 +1,16 @@
 """Tests for stateless chat validation helpers and websocket guardrails."""
 
 import asyncio
+import os
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
-from backend import env
-from backend.ai.providers.gemini import _is_retryable_gemini_error
+from backend import ai_service, env
+from backend.ai.providers.claude import ClaudeProvider
+from backend.ai.providers.gemini import GeminiProvider, _is_retryable_gemini_error
 from backend.ai.retry import is_retryable_ai_error, with_ai_retry
+from backend import main
 from backend.main import (
     _chat_rate_windows,
     _is_allowed_ws_origin,
@@ -232,3 +236,278 @@ def test_with_ai_retry_does_not_retry_non_retryable_errors():
         raise AssertionError("Expected RuntimeError for non-retryable failure")
 
     assert attempts["count"] == 1
+
+
+def test_claude_provider_reuses_client_until_closed():
+    """One pooled Anthropic client per provider; shutdown releases it."""
+    provider = ClaudeProvider(api_key="test-key")
+    client = provider._get_client()
+
+    assert provider._get_client() is client
+
+    asyncio.run(provider.aclose())
+    assert provider._client is None
+    assert client.is_closed()
+
+
+def test_provider_clients_are_rebuilt_after_fork(monkeypatch):
+    """A forked worker (new pid) must not reuse the parent's pooled client."""
+    for provider in (ClaudeProvider(api_key="test-key"), GeminiProvider(api_key="test-key")):
+        parent_client = provider._get_client()
+        monkeypatch.setattr("os.getpid", lambda: -1)
+
+        child_client = provider._get_client()
+
+        assert child_client is not parent_client
+        assert provider._get_client() is child_client
+        monkeypatch.undo()
+
+
+def test_claude_provider_marks_system_prompt_for_prompt_caching():
+    """The static system prompt should carry an ephemeral cache_control breakpoint."""
+    captured = {}
+
+    class _Messages:
+        async def create(self, **kwargs):
+            captured.update(kwargs)
+            return SimpleNamespace(content=[SimpleNamespace(text="ok")])
+
+    provider = ClaudeProvider(api_key="test-key")
+    provider._client = SimpleNamespace(messages=_Messages())
+    provider._client_pid = os.getpid()
+
+    assert asyncio.run(provider.call_llm("static system", "user")) == "ok"
+    assert captured["system"] == [
+        {"type": "text", "text": "static system", "cache_control": {"type": "ephemeral"}}
+    ]
+
+
+def test_gemini_provider_reuses_client_until_closed():
+    """Gemini should share one client per provider instead of building one per call."""
+    provider = GeminiProvider(api_key="test-key")
+    client = provider._get_client()
+
+    assert provider._get_client() is client
+
+    asyncio.run(provider.aclose())
+    assert provider._client is None
+
+
+def test_get_provider_builds_one_instance_per_name(monkeypatch):
+    """Repeated lookups must hand back the same provider (and pooled client)."""
+    monkeypatch.setattr(env, "AI_PROVIDER", " Claude ")
+    ai_service._build_provider.cache_clear()
+    try:
+        assert ai_service._get_provider() is ai_service._get_provider()
+        assert isinstance(ai_service._get_provider(), ClaudeProvider)
+    finally:
+        ai_service._build_provider.cache_clear()
+
+
+def _fake_gemini_client(create_error=None):
+    """Minimal genai.Client stand-in recording cache creations and generate configs."""
+    calls = {"creates": 0, "configs": []}
+
+    class _Caches:
+        async def create(self, model, config):
+            calls["creates"] += 1
+            if create_error:
+                raise create_error
+            return SimpleNamespace(name="cachedContents/abc")
+
+    class _Models:
+        async def generate_content(self, model, contents, config):
+            calls["configs"].append(config)
+            return SimpleNamespace(text="ok")
+
+    return SimpleNamespace(aio=SimpleNamespace(caches=_Caches(), models=_Models())), calls
+
+
+def test_gemini_provider_reuses_context_cache_for_system_prompt():
+    """A static system prompt should be cached once and referenced by name afterwards."""
+    provider = GeminiProvider(api_key="test-key")
+    provider._client, calls = _fake_gemini_client()
+    provider._client_pid = os.getpid()
+
+    async def run():
+        await provider.call_llm("static system", "first")
+        await provider.call_llm("static system", "second")
+
+    asyncio.run(run())
+
+    assert calls["creates"] == 1
+    assert all(c.cached_content == "cachedContents/abc" for c in calls["configs"])
+    assert all(c.system_instruction is None for c in calls["configs"])
+
+
+def test_gemini_provider_falls_back_to_inline_system_when_cache_rejected():
+    """Prompts Gemini won't cache (too short, etc.) must still be sent inline, without retrying create."""
+    provider = GeminiProvider(api_key="test-key")
+    provider._client, calls = _fake_gemini_client(create_error=RuntimeError("400 too few tokens"))
+    provider._client_pid = os.getpid()
+
+    async def run():
+        await provider.call_llm("short system", "first")
+        await provider.call_llm("short system", "second")
+
+    asyncio.run(run())
+
+    assert calls["creates"] == 1
+    assert all(c.system_instruction == "short system" for c in calls["configs"])
+    assert all(c.cached_content is None for c in calls["configs"])
+
+
+def test_lifespan_shutdown_closes_cached_provider(monkeypatch):
+    """App shutdown should close whichever provider ai_service cached."""
+    closed = {"count": 0}
+
+    class _Provider:
+        async def aclose(self):
+            closed["count"] += 1
+
+    monkeypatch.setattr(env, "AI_PROVIDER", "claude")
+    monkeypatch.setattr(ai_service, "ClaudeProvider", _Provider)
+    ai_service._build_provider.cache_clear()
+    ai_service._get_provider()
+    with TestClient(app):
+        pass
+
+    assert closed["count"] == 1
+    assert ai_service._build_provider.cache_info().currsize == 0
+
+
+def test_lifespan_startup_warms_provider_when_enabled(monkeypatch):
+    """Startup should pre-open the provider connection without blocking the app."""
+    warmed = {"count": 0}
+
+    async def fake_warm_up_provider():
+        warmed["count"] += 1
+
+    monkeypatch.setattr(env, "AI_PROVIDER_WARMUP", True)
+    monkeypatch.setattr(ai_service, "warm_up_provider", fake_warm_up_provider)
+    with TestClient(app) as client:
+        client.get("/")
+
+    assert warmed["count"] == 1
+
+
+def test_github_http_client_is_shared_until_shutdown():
+    """Requests reuse one pooled GitHub client; app shutdown closes it."""
+    with TestClient(app):
+        client = main._get_http_client()
+        assert main._get_http_client() is client
+
+    assert client.is_closed
+    assert main._get_http_client() is not client
+    asyncio.run(main._aclose_http_client())
+
+
+def test_stream_serves_repeat_request_from_explanation_cache(monkeypatch):
+    """A finished stream is replayed for the same repo without touching GitHub or the model."""
+    calls = {"context": 0}
+
+    async def fake_get_repo_context(self, repo, status_callback=None):
+        calls["context"] += 1
+        return "some context", True, 5, 2, 0
+
+    async def fake_get_default_branch(self, repo):
+        return "main"
+
+    async def fake_explain_repo(repo, content, instructions=None, status_callback=None, chunk_callback=None):
+        return "An explanation", True
+
+    monkeypatch.setattr(main.GitHubTools, "get_repo_context", fake_get_repo_context)
+    monkeypatch.setattr(main.GitHubTools, "get_default_branch", fake_get_default_branch)
+    monkeypatch.setattr(ai_service, "explain_repo", fake_explain_repo)
+    monkeypatch.setattr(main, "_explanation_cache", main.LLMCache(max_entries=8, ttl_seconds=60))
+    request = SimpleNamespace(client=SimpleNamespace(host="1.2.3.4"), headers={}, query_params={})
+
+    async def collect(req):
+        return [event async for event in main._stream_generator("octocat", "Hello-World", None, None, req)]
+
+    first = asyncio.run(collect(request))
+    second = asyncio.run(collect(request))
+
+    assert calls["context"] == 1
+    assert first[-1].startswith("event: result") and '"cache":false' in first[-1]
+    assert second == [second[-1]] and '"cache":true' in second[-1]
+
+    # Requests carrying their own GitHub token are never served from the shared cache.
+    private = SimpleNamespace(client=request.client, headers={"X-GitHub-Token": "t"}, query_params={})
+    asyncio.run(collect(private))
+    assert calls["context"] == 2
+
+
+def test_with_ai_retry_caps_concurrent_provider_calls(monkeypatch):
+    """Provider calls beyond AI_MAX_CONCURRENT_CALLS wait for a free slot."""
+    monkeypatch.setattr(env, "AI_MAX_CONCURRENT_CALLS", 2)
+    active = {"now": 0, "peak": 0}
+
+    async def operation() -> str:
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return "ok"
+
+    async def burst():
+        return await asyncio.gather(*(with_ai_retry("test", operation) for _ in range(5)))
+
+    assert asyncio.run(burst()) == ["ok"] * 5
+    assert active["peak"] == 2
+
+
+def test_streams_do_not_hold_the_shared_provider_call_slots(monkeypatch):
+    """A full stream pool leaves AI_MAX_CONCURRENT_CALLS free for short calls."""
+    monkeypatch.setattr(env, "AI_MAX_CONCURRENT_CALLS", 1)
+    monkeypatch.setattr(env, "AI_MAX_CONCURRENT_STREAMS", 1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def long_stream() -> str:
+            await release.wait()
+            return "streamed"
+
+        async def short_call() -> str:
+            return "ok"
+
+        stream = asyncio.create_task(with_ai_retry("stream", long_stream, streaming=True))
+        await asyncio.sleep(0)
+        short = await asyncio.wait_for(with_ai_retry("call", short_call), timeout=1)
+        release.set()
+        return short, await stream
+
+    assert asyncio.run(run()) == ("ok", "streamed")
+
+
+def test_with_ai_retry_waits_for_provider_retry_after(monkeypatch):
+    """A Retry-After on a 429 stretches the backoff beyond the default delay."""
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr("backend.ai.retry.asyncio.sleep", fake_sleep)
+    attempts = {"count": 0}
+
+    async def throttled_operation() -> str:
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            error = RuntimeError("429 Too Many Requests")
+            error.response = SimpleNamespace(headers={"retry-after": "4"})
+            raise error
+        return "ok"
+
+    assert asyncio.run(with_ai_retry("test", throttled_operation, attempts=2)) == "ok"
+    assert sleeps == [4.0]
+
+
+def test_user_facing_error_maps_known_failures():
+    """Known provider failures get a friendly message; anything else passes through."""
+    assert "too much content" in main._user_facing_error("Error: prompt is too long: 210000 tokens")
+    assert "too much content" in main._user_facing_error("input too long, max 200k Tokens")
+    assert "Could not reach" in main._user_facing_error("Connection attempt failed")
+    assert main._user_facing_error("Error code: 429") == "Rate limit exceeded. Please try again later."
+    assert main._user_facing_error("invalid api key") == "invalid api key"
+    assert main._user_facing_error("") == "Something went wrong. Please try again."
@@ -9,6 +9,7 @@ from fastapi.testclient import TestClient
 from backend import main
 from backend.ai.retry import with_ai_retry
 from backend.github_tools import GitHubTools
+from backend.schema import GitHubApiError
 
 
 def _fake_request(client_ip: str = "1.2.3.4", query_params: dict | None = None) -> SimpleNamespace:
@@ -125,7 +126,7 @@ def test_stream_pipeline_ai_failure_captures_error_event(monkeypatch):
     async def fake_get_repo_context(self, repo, status_callback=None):
         return "some context", True, 5, 2, 0
 
-    async def fake_explain_repo(repo, content, instructions=None, status_callback=None):
+    async def fake_explain_repo(repo, content, instructions=None, status_callback=None, chunk_callback=None):
         return "model overloaded", False
 
     monkeypatch.setattr(GitHubTools, "get_default_branch", fake_get_default_branch)
@@ -146,6 +147,31 @@ def test_stream_pipeline_ai_failure_captures_error_event(monkeypatch):
     assert props["tree_file_count"] == 5
 
 
+def test_stream_pipeline_reports_missing_repo_from_api_404(monkeypatch):
+    """Without the github.com pre-check, a repo 404 from the API becomes the user-facing error."""
+    import asyncio
+
+    mock_client = MagicMock()
+    monkeypatch.setattr(main, "posthog_client", mock_client)
+
+    async def fake_get_repo_context(self, repo, status_callback=None):
+        raise GitHubApiError("Tree or ref 'HEAD' not found", status_code=404)
+
+    monkeypatch.setattr(GitHubTools, "get_repo_context", fake_get_repo_context)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    asyncio.run(
+        main._run_stream_pipeline("octocat", "missing", None, None, _fake_request(), queue)
+    )
+
+    assert queue.get_nowait() == {
+        "error": "Repository 'octocat/missing' not found. Please check the owner and repository name."
+    }
+    props = mock_client.capture.call_args.kwargs["properties"]
+    assert props["error_stage"] == "context_fetch"
+    assert props["error_type"] == "HTTP404"
+
+
 def test_track_event_never_raises_when_capture_fails(monkeypatch):
     """A broken PostHog client must never break the request path."""
     mock_client = MagicMock()
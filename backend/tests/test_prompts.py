@@ -1,6 +1,15 @@
 """Tests for prompt parsing helpers."""
 
-from backend.prompts import SUGGEST_QUESTIONS_SYSTEM, SYSTEM_PROMPT, parse_questions_from_response
+from backend.prompts import (
+    SUGGEST_QUESTIONS_SYSTEM,
+    SYSTEM_PROMPT,
+    FILES_TO_EXPLORE_USER_TEMPLATE,
+    USER_PROMPT_TEMPLATE,
+    build_files_to_explore_user,
+    build_user_prompt,
+    parse_paths_from_response,
+    parse_questions_from_response,
+)
 
 
 def test_system_prompt_forbids_reserved_words_as_mermaid_node_ids():
@@ -47,3 +56,34 @@ def test_parse_questions_from_response_caps_at_three():
 def test_parse_questions_from_response_empty_input():
     assert parse_questions_from_response("") == []
     assert parse_questions_from_response("   \n  ") == []
+
+
+def test_files_to_explore_builder_reuses_rendered_prompt_for_identical_inputs():
+    build_files_to_explore_user.cache_clear()
+    assert build_files_to_explore_user("└── octo/repo/") is build_files_to_explore_user("└── octo/repo/")
+    assert build_files_to_explore_user.cache_info().hits == 1
+
+
+def test_prompt_builders_match_their_templates():
+    context = "FILE: a.json\n{\"k\": \"{not a field}\"}"
+    assert build_user_prompt("octo/repo", context) == USER_PROMPT_TEMPLATE.format(
+        repo_name="octo/repo", repo_context=context, user_instructions_section=""
+    )
+    assert build_files_to_explore_user("└── {weird}/") == FILES_TO_EXPLORE_USER_TEMPLATE.format(tree="└── {weird}/")
+    assert build_user_prompt("octo/repo", context, " focus on tests ").startswith(
+        'USER REQUEST (answer this by tailoring the content inside sections 1–4 only; '
+        'do NOT add a separate section or paragraph at the end for this):\n"focus on tests"\n\n'
+        "Explain this repository: octo/repo\n"
+    )
+
+
+def test_parse_paths_from_response_skips_fences_bullets_and_prose():
+    response = "```text\nREADME.md\n- src/main.py\n*   Makefile\n# Key files\n<tree>\nsee the docs folder\n```"
+    assert parse_paths_from_response(response) == ["README.md", "src/main.py", "Makefile"]
+
+
+def test_parse_paths_from_response_strips_bare_and_tagged_fences():
+    assert parse_paths_from_response("```\nREADME.md\nsetup.py\n```") == ["README.md", "setup.py"]
+    assert parse_paths_from_response("```plain_text\nREADME.md\n```") == ["README.md"]
+    assert parse_paths_from_response("```\n```") == []
+    assert parse_paths_from_response("```") == []
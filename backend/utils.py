@@ -1,16 +1,44 @@
 from datetime import datetime, timezone
+import json
 import logging
+from typing import Any
+
 from backend import env
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib fallbacks below produce the same bytes
+    orjson = None
+
 __all__ = [
     "date_now",
+    "json_dumps",
+    "json_loads",
     "logger"
 ]
 # Set up logging configuration
-_level = logging._nameToLevel.get(env.LOGGER_LEVEL, "INFO")
-logging.basicConfig(level=_level)
+_level = logging.getLevelNamesMapping().get(env.LOGGER_LEVEL.strip().upper(), logging.INFO)
+# basicConfig is a no-op when the server already configured the root logger, so the
+# level is also set on our own logger rather than inherited from whatever root has.
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=_level)
 logger = logging.getLogger(__name__)
+logger.setLevel(_level)
 
 def date_now() -> datetime:
     """Creates a TZ-aware instance of datetime.now()"""
-    return datetime.now(tz=timezone.utc)
\ No newline at end of file
+    return datetime.now(tz=timezone.utc)
+
+
+def json_loads(data: bytes | str) -> Any:
+    """Parse JSON with orjson when installed (much faster on multi-MB GitHub tree responses)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, identical with or without orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -54,6 +54,7 @@ export function DesktopApp({ theme, onToggleTheme, explain, defaultQuery }: Desk
         <DesktopLoading
           repoName={repoName || 'owner/repo'}
           currentStage={explain.currentStage}
+          partialExplanation={explain.partialExplanation}
           notifyEnabled={explain.notifyEnabled}
           notifySupported={explain.notifySupported}
           onEnableNotify={explain.enableNotifications}
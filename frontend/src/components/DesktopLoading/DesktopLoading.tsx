@@ -3,7 +3,6 @@ import { EXPLAIN_STAGE_ORDER } from '../../hooks/useExplainFlow';
 import './DesktopLoading.css';
 
 const STEP_LABELS: Record<string, string> = {
-  validating: 'Validating repository',
   fetching_tree: 'Fetching directory structure',
   exploring_files: 'AI is exploring which files to read',
   fetching_files: 'Fetching file contents',
@@ -16,6 +15,8 @@ const STEPS = [CONNECTING_STEP, ...EXPLAIN_STAGE_ORDER];
 interface DesktopLoadingProps {
   repoName: string;
   currentStage: string | null;
+  /** Explanation text streamed so far; shown as a live preview once generation starts. */
+  partialExplanation: string;
   notifyEnabled: boolean;
   notifySupported: boolean;
   onEnableNotify: () => void;
@@ -25,6 +26,7 @@ interface DesktopLoadingProps {
 export function DesktopLoading({
   repoName,
   currentStage,
+  partialExplanation,
   notifyEnabled,
   notifySupported,
   onEnableNotify,
@@ -89,6 +91,12 @@ export function DesktopLoading({
             );
           })}
 
+          {partialExplanation && (
+            <div className="dl-stream-preview" aria-live="polite">
+              {partialExplanation}
+            </div>
+          )}
+
           {notifySupported && (
             <button type="button" className="dl-notify-btn" onClick={onEnableNotify}>
               {notifyEnabled ? "✓ We'll notify you when it's ready" : "🔔 Notify me when it's ready"}
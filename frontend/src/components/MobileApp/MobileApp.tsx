@@ -62,6 +62,7 @@ export function MobileApp({ theme, onToggleTheme, explain, defaultQuery }: Mobil
         <MobileLoading
           repoName={repoName || 'owner/repo'}
           currentStage={explain.currentStage}
+          partialExplanation={explain.partialExplanation}
           notifyEnabled={explain.notifyEnabled}
           notifySupported={explain.notifySupported}
           onEnableNotify={explain.enableNotifications}
@@ -3,7 +3,6 @@ import { EXPLAIN_STAGE_ORDER } from '../../hooks/useExplainFlow';
 import './MobileLoading.css';
 
 const STEP_LABELS: Record<string, string> = {
-  validating: 'Validating repository',
   fetching_tree: 'Fetching directory structure',
   exploring_files: 'AI is exploring which files to read',
   fetching_files: 'Fetching file contents',
@@ -19,6 +18,8 @@ const STEPS = [CONNECTING_STEP, ...EXPLAIN_STAGE_ORDER];
 interface MobileLoadingProps {
   repoName: string;
   currentStage: string | null;
+  /** Explanation text streamed so far; shown as a live preview once generation starts. */
+  partialExplanation: string;
   notifyEnabled: boolean;
   notifySupported: boolean;
   onEnableNotify: () => void;
@@ -28,6 +29,7 @@ interface MobileLoadingProps {
 export function MobileLoading({
   repoName,
   currentStage,
+  partialExplanation,
   notifyEnabled,
   notifySupported,
   onEnableNotify,
@@ -93,6 +95,12 @@ export function MobileLoading({
         })}
       </div>
 
+      {partialExplanation && (
+        <div className="ml-stream-preview" aria-live="polite">
+          {partialExplanation}
+        </div>
+      )}
+
       <div className="ml-actions">
         {notifySupported && (
           <button type="button" className="ml-notify-btn" onClick={onEnableNotify}>
@@ -7,7 +7,6 @@ import { loadStoredRepoState, saveRepoOverview } from '../utils/repoStorage';
 import { prefetchSuggestedQuestions } from './useSuggestedQuestions';
 
 const STAGE_MESSAGES: Record<string, string> = {
-  validating: 'Validating repository...',
   fetching_tree: 'Fetching directory structure...',
   exploring_files: 'AI is exploring which files to read...',
   fetching_files: 'Fetching file contents...',
@@ -16,7 +15,6 @@ const STAGE_MESSAGES: Record<string, string> = {
 
 /** Stage keys in the order the backend emits them, used to drive step-indicator UIs. */
 export const EXPLAIN_STAGE_ORDER = [
-  'validating',
   'fetching_tree',
   'exploring_files',
   'fetching_files',
@@ -46,6 +44,8 @@ export interface UseExplainFlowReturn {
   completedSteps: string[];
   /** Raw stage key of the in-flight SSE stage (e.g. "fetching_tree"), null when idle or before the first event. */
   currentStage: string | null;
+  /** Explanation text streamed so far via SSE "chunk" events; empty until generation starts. */
+  partialExplanation: string;
   parsedRepo: ParsedRepo | null;
   notifyEnabled: boolean;
   notifySupported: boolean;
@@ -71,6 +71,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
   const [statusMessage, setStatusMessage] = useState<string | null>(null);
   const [completedSteps, setCompletedSteps] = useState<string[]>([]);
   const [currentStage, setCurrentStage] = useState<string | null>(null);
+  const [partialExplanation, setPartialExplanation] = useState('');
   const [parsedRepo, setParsedRepo] = useState<ParsedRepo | null>(null);
   const [notifyEnabled, setNotifyEnabled] = useState(false);
 
@@ -122,6 +123,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
     setStatusMessage(null);
     setCompletedSteps([]);
     setCurrentStage(null);
+    setPartialExplanation('');
     gotResultRef.current = false;
     failureTrackedRef.current = false;
     lastSubmitRef.current = { query, instructions };
@@ -219,6 +221,18 @@ export function useExplainFlow(): UseExplainFlowReturn {
       }
     });
 
+    es.addEventListener('chunk', (event: MessageEvent) => {
+      try {
+        const data = JSON.parse(event.data as string) as { delta?: string };
+        const delta = data?.delta;
+        if (delta) {
+          setPartialExplanation((prev) => prev + delta);
+        }
+      } catch {
+        // ignore parse errors
+      }
+    });
+
     es.addEventListener('result', (event: MessageEvent) => {
       gotResultRef.current = true;
       try {
@@ -246,6 +260,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
       setStatusMessage(null);
       setCompletedSteps([]);
       setCurrentStage(null);
+      setPartialExplanation('');
     });
 
     es.addEventListener('error', (event: MessageEvent) => {
@@ -268,6 +283,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
       setStatusMessage(null);
       setCompletedSteps([]);
       setCurrentStage(null);
+      setPartialExplanation('');
     });
 
     es.onerror = () => {
@@ -282,6 +298,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
       setStatusMessage(null);
       setCompletedSteps([]);
       setCurrentStage(null);
+      setPartialExplanation('');
     };
   }, []);
 
@@ -300,6 +317,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
     setStatusMessage(null);
     setCompletedSteps([]);
     setCurrentStage(null);
+    setPartialExplanation('');
   }, []);
 
   const reset = useCallback(() => {
@@ -310,6 +328,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
     setStatusMessage(null);
     setCompletedSteps([]);
     setCurrentStage(null);
+    setPartialExplanation('');
     setParsedRepo(null);
   }, []);
 
@@ -321,6 +340,7 @@ export function useExplainFlow(): UseExplainFlowReturn {
     statusMessage,
     completedSteps,
     currentStage,
+    partialExplanation,
     parsedRepo,
     notifyEnabled,
     notifySupported,